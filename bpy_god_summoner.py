@@ -58,10 +58,48 @@ useOpenDialog = True
 from pathlib import Path  # Needed for os stuff
 import random
 import struct  # Needed for Binary Reader
+import mmap  # Needed for Binary Reader, maps large files instead of copying them
+import array  # Needed for Binary Reader, fallback for bulk reads when numpy is missing
+import sys
+import time
+import io
+import contextlib
+import concurrent.futures  # Needed for the catalog scanner
+import multiprocessing
+import zlib  # lzop checksums
+import hashlib  # cache keys
+import tempfile
+import collections
+import pickle
 import math
-import bpy
-import mathutils  # this i'm guessing is a branch of the bpy module specifically for math operations
 import os
+import argparse  # command line tools, see main
+import types
+import importlib.util
+import importlib.machinery
+
+try:
+    import bpy
+    import mathutils  # this i'm guessing is a branch of the bpy module specifically for math operations
+except ImportError:
+    # outside blender, the format classes and the command line tools still work
+    bpy = None
+    mathutils = None
+
+try:
+    import numpy as np  # bundled with blender, used for bulk buffer reads
+except ImportError:
+    np = None
+
+try:
+    import sqlite3  # asset catalog, see catalogScan
+except ImportError:
+    sqlite3 = None
+
+try:
+    from multiprocessing import shared_memory, resource_tracker  # readMany worker results
+except ImportError:
+    shared_memory = None
 
 signed, unsigned = 0, 1  # Enums for read function
 seek_set, seek_cur, seek_end = 0, 1, 2  # Enums for seek function
@@ -664,6 +702,35 @@ def quatToMatrix3(q=[0.0, 0.0, 0.0, 0.0]):
     return mat
 
 
+def matrixToQuatArray(m=[]):
+    # matrix3.asQuat for a stack of (n, 3, 3) rotation rows, returns (n, 4)
+    m = np.asarray(m, dtype=np.float64)
+    r11, r12, r13 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    r21, r22, r23 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    r31, r32, r33 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+    q = np.stack([
+        (r11 + r22 + r33 + 1.0) / 4.0,
+        (r11 - r22 - r33 + 1.0) / 4.0,
+        (-r11 + r22 - r33 + 1.0) / 4.0,
+        (-r11 - r22 + r33 + 1.0) / 4.0
+    ], axis=1)
+    q = np.sqrt(np.maximum(q, 0.0))
+
+    def sgn(x): return np.where(x >= 0.0, 1.0, -1.0)
+
+    one = np.ones(len(m))
+    signs = np.stack([
+        np.stack([one, sgn(r32 - r23), sgn(r13 - r31), sgn(r21 - r12)], axis=1),
+        np.stack([sgn(r32 - r23), one, sgn(r21 + r12), sgn(r13 + r31)], axis=1),
+        np.stack([sgn(r13 - r31), sgn(r21 + r12), one, sgn(r32 + r23)], axis=1),
+        np.stack([sgn(r21 - r12), sgn(r31 + r13), sgn(r32 + r23), one], axis=1)
+    ], axis=1)
+
+    # argmax picks the first largest component, same order as the if/elif chain
+    q *= signs[np.arange(len(m)), np.argmax(q, axis=1)]
+    return q / np.sqrt(np.sum(q * q, axis=1))[:, None]
+
+
 class skinOps:
     mesh = None
     skin = None
@@ -1455,6 +1522,23 @@ def findItem(array, value):
     return index
 
 
+def faceMax(faces=[]):
+    # largest index in a face array, -1 if empty
+    if len(faces) == 0: return -1
+    if hasattr(faces, 'max'): return int(faces.max())
+    m = -1
+    for face in faces:
+        for i in face:
+            if i > m: m = i
+    return m
+
+
+def toList(array):
+    # numpy arrays to nested python lists, anything else to a list
+    if hasattr(array, 'tolist'): return array.tolist()
+    return list(array)
+
+
 def append(array, value):
     array.append(value)
     return None
@@ -1666,25 +1750,609 @@ def MultiMaterial(numsubs=1):
     return mats
 
 
+# files at or above this size are memory mapped instead of read into memory
+mmapThreshold = 16 * 1024 * 1024
+
+# compiled struct.Struct objects, keyed by format string or (format, count, endian)
+struct_cache = {}
+
+# format characters for each primitive, indexed by the signed / unsigned enum
+struct_types = {
+    'byte': ('b', 'B'),
+    'short': ('h', 'H'),
+    'long': ('i', 'I'),
+    'longlong': ('q', 'Q'),
+    'float': ('f', 'f'),
+    'double': ('d', 'd'),
+    'half': ('e', 'e')
+}
+
+# one lookup table per endian, built on first use
+struct_tables = {}
+
+
+def getStruct(fmt='B', count=1, isLittle=True):
+    # returns a compiled struct for count consecutive values of fmt
+    key = (fmt, count, isLittle)
+    st = struct_cache.get(key)
+    if st == None:
+        st = struct.Struct(('<' if isLittle else '>') + (str(count) if count > 1 else '') + fmt)
+        struct_cache[key] = st
+    return st
+
+
+def getStructTable(isLittle=True):
+    # returns {(type, signed/unsigned): struct.Struct} for the given endian
+    table = struct_tables.get(isLittle)
+    if table == None:
+        table = {}
+        for k, v in struct_types.items():
+            table[(k, signed)] = getStruct(v[0], 1, isLittle)
+            table[(k, unsigned)] = getStruct(v[1], 1, isLittle)
+        struct_tables[isLittle] = table
+    return table
+
+
+class ReadError(Exception):
+    '''
+        raised by a strict fopen when a read or a count runs past the end of
+        the buffer, or when the parse budget set by setBudget is exceeded
+    '''
+
+    def __init__(self, message="", offset=0, file=""):
+        Exception.__init__(self, message)
+        self.message = message
+        self.offset = offset
+        self.file = file
+
+    def __str__(self):
+        return "%s @ 0x%X {%s}" % (self.message, self.offset, self.file)
+
+
+# ====================================================================================
+# LZO1X
+# ====================================================================================
+# the assets are said to be lzo1x compressed, no samples were available so both the
+# lzop container and a raw stream behind a uint32 decompressed size are recognised.
+# the decoder is a port of lzo1x_decompress_safe, literal and match runs are copied
+# as slices rather than byte by byte
+
+# decompress files that don't start with a known magic when fopen reads them
+autoDecompress = True
+
+# magics the parsers understand, anything else is checked for compression
+knownMagics = (b'2MS\x00', b'2IKS', b'S\x00K\x00', b'DDS ')
+
+lzopMagic = b'\x89LZO\x00\r\n\x1a\n'
+
+# largest decompressed size accepted from a raw stream header
+lzoMaxSize = 512 * 1024 * 1024
+
+
+def lzo1x_decompress(src=b'', outlen=0):
+    '''
+        decodes a raw LZO1X stream, any of the lzo1x compressors output this
+        outlen is the decompressed size when known, the output grows as it's
+        decoded and a stream that goes past or stops short of outlen is an error,
+        so a bogus size can't allocate more than the stream really produces
+        returns a bytearray, raises ReadError on a corrupt stream
+    '''
+    src = memoryview(src).cast('B')
+    end = len(src)
+    out = bytearray()
+    ip = op = 0
+    state = 0  # 0: literal run or match, 1: after a literal run, 2: after 1-3 trailing literals
+    try:
+        t = src[0]
+        if t > 17:
+            t -= 17
+            ip = 1
+            if ip + t > end: raise IndexError
+            out[op:op + t] = src[ip:ip + t]
+            op += t
+            ip += t
+            state = 1 if t >= 4 else 2
+        while True:
+            if outlen > 0 and op > outlen:
+                raise ReadError("LZO1X output overruns %i bytes" % (outlen), ip, "lzo1x")
+            t = src[ip]
+            ip += 1
+            if t < 16:
+                if state == 0:
+                    # literal run
+                    if t == 0:
+                        t = 15
+                        while src[ip] == 0:
+                            t += 255
+                            ip += 1
+                        t += src[ip]
+                        ip += 1
+                    t += 3
+                    if ip + t > end: raise IndexError
+                    out[op:op + t] = src[ip:ip + t]
+                    op += t
+                    ip += t
+                    state = 1
+                    continue
+                elif state == 1:
+                    m = op - 0x801 - (t >> 2) - (src[ip] << 2)
+                    n = 3
+                else:
+                    m = op - 1 - (t >> 2) - (src[ip] << 2)
+                    n = 2
+                ip += 1
+            elif t >= 64:
+                m = op - 1 - ((t >> 2) & 7) - (src[ip] << 3)
+                ip += 1
+                n = (t >> 5) + 1
+            elif t >= 32:
+                n = t & 31
+                if n == 0:
+                    n = 31
+                    while src[ip] == 0:
+                        n += 255
+                        ip += 1
+                    n += src[ip]
+                    ip += 1
+                m = op - 1 - ((src[ip] | (src[ip + 1] << 8)) >> 2)
+                ip += 2
+                n += 2
+            else:
+                m = op - ((t & 8) << 11)
+                n = t & 7
+                if n == 0:
+                    n = 7
+                    while src[ip] == 0:
+                        n += 255
+                        ip += 1
+                    n += src[ip]
+                    ip += 1
+                m -= (src[ip] | (src[ip + 1] << 8)) >> 2
+                ip += 2
+                if m == op: break  # end of stream
+                m -= 0x4000
+                n += 2
+
+            # match, an overlapping copy repeats the pattern
+            if m < 0: raise ReadError("LZO1X lookbehind overrun", ip, "lzo1x")
+            d = op - m
+            if n <= d:
+                out[op:op + n] = out[m:m + n]
+            else:
+                out[op:op + n] = (out[m:op] * (n // d + 1))[0:n]
+            op += n
+
+            t = src[ip - 2] & 3
+            if t == 0:
+                state = 0
+            else:
+                if ip + t > end: raise IndexError
+                out[op:op + t] = src[ip:ip + t]
+                op += t
+                ip += t
+                state = 2
+    except IndexError:
+        raise ReadError("LZO1X input overrun", ip, "lzo1x")
+    if outlen > 0 and op != outlen:
+        raise ReadError("LZO1X output is %i bytes, expected %i" % (op, outlen), ip, "lzo1x")
+    return out
+
+
+def lzop_unpack(data=b''):
+    '''
+        unpacks a file written by lzop, returns None if data isn't one
+    '''
+    data = memoryview(data).cast('B')
+    if bytes(data[0:9]) != lzopMagic: return None
+    be = getStructTable(False)
+    u16, u32 = be[('short', unsigned)], be[('long', unsigned)]
+    p = 9
+    version = u16.unpack_from(data, p)[0]
+    p += 4  # version, lib_version
+    if version >= 0x0940: p += 2  # version_needed
+    method = data[p]
+    p += 1
+    if version >= 0x0940: p += 1  # level
+    flags = u32.unpack_from(data, p)[0]
+    p += 4
+    if flags & 0x800: p += 4  # filter
+    p += 8  # mode, mtime
+    if version >= 0x0940: p += 4  # mtime high
+    p += 1 + data[p] + 4  # name, header checksum
+    if flags & 0x40: p += 4 + u32.unpack_from(data, p)[0] + 4  # extra field
+    if method < 1 or method > 3:
+        raise ReadError("Unsupported lzop method %i" % method, p, "lzop")
+
+    out = bytearray()
+    while True:
+        dst_len = u32.unpack_from(data, p)[0]
+        p += 4
+        if dst_len == 0: break
+        src_len = u32.unpack_from(data, p)[0]
+        p += 4
+        dst_check = -1
+        if flags & 0x101:
+            dst_check = u32.unpack_from(data, p)[0]
+            p += 4
+        if src_len < dst_len and flags & 0x202: p += 4
+        if src_len > dst_len or p + src_len > len(data):
+            raise ReadError("Bad lzop block", p, "lzop")
+        if src_len == dst_len:
+            block = data[p:p + src_len]
+        else:
+            block = lzo1x_decompress(data[p:p + src_len], dst_len)
+        if dst_check != -1:
+            check = zlib.adler32(block) if flags & 0x1 else zlib.crc32(block)
+            if check != dst_check: raise ReadError("lzop checksum mismatch", p, "lzop")
+        out += block
+        p += src_len
+    return out
+
+
+def lzo1x_plausible(src=b''):
+    '''
+        cheap test that src could be a LZO1X stream of one of our files, it has to
+        end in the end of stream marker and open with a literal run holding a
+        known magic, checked before anything is decompressed
+    '''
+    src = memoryview(src).cast('B')
+    if len(src) < 8 or bytes(src[len(src) - 3:]) != b'\x11\x00\x00': return False
+    t = src[0]
+    ip = 1
+    if t > 17:
+        if t - 17 < 4: return False
+    elif t < 16:
+        if t == 0:
+            while ip < len(src) and src[ip] == 0: ip += 1
+            ip += 1
+    else:
+        return False
+    return bytes(src[ip:ip + 4]) in knownMagics
+
+
+def lzo_unpack(data=b''):
+    '''
+        sniffs data for an lzop file or a uint32 decompressed size followed by a
+        LZO1X stream, returns the decompressed bytes or None if it isn't either
+        a raw stream is only accepted if it decompresses to a known magic
+    '''
+    data = memoryview(data).cast('B')
+    if bytes(data[0:9]) == lzopMagic: return lzop_unpack(data)
+    result = None
+    if len(data) > 7 and not bytes(data[0:4]) in knownMagics:
+        size = getStructTable(True)[('long', unsigned)].unpack_from(data, 0)[0]
+        if size >= 4 and size <= lzoMaxSize and size <= len(data) * 256 and lzo1x_plausible(data[4:]):
+            try:
+                out = lzo1x_decompress(data[4:], size)
+                if bytes(out[0:4]) in knownMagics: result = out
+            except ReadError:
+                result = None
+    return result
+
+
+def lzo1x_write_literals(out=bytearray(), lits=b'', first=False):
+    # emits a literal run, 1-3 literals after a match go in that match's spare bits
+    t = len(lits)
+    if t == 0: return None
+    if first and t <= 238:
+        out.append(17 + t)
+    elif t <= 3:
+        out[len(out) - 2] |= t
+    elif t <= 18:
+        out.append(t - 3)
+    else:
+        lzo1x_write_length(out, 0, t - 18)
+    out += lits
+    return None
+
+
+def lzo1x_write_length(out=bytearray(), marker=0, t=0):
+    # marker byte followed by a zero run and the remainder of a long length
+    out.append(marker)
+    while t > 255:
+        t -= 255
+        out.append(0)
+    out.append(t)
+    return None
+
+
+def lzo1x_write_match(out=bytearray(), dist=1, length=3, state=0):
+    '''
+        emits a match, state is the number of literals since the last match and
+        picks whether the short M1 forms can be used
+        length 2 needs 1-3 literals before it and a distance of 1024 or less
+        dist can be up to 0xBFFF
+    '''
+    if length == 2:
+        d = dist - 1
+        out.append((d & 3) << 2)
+        out.append(d >> 2)
+    elif length == 3 and state >= 4 and dist > 0x800 and dist <= 0xC00:
+        d = dist - 0x801
+        out.append((d & 3) << 2)
+        out.append(d >> 2)
+    elif length <= 8 and dist <= 0x800:
+        d = dist - 1
+        out.append(((length - 1) << 5) | ((d & 7) << 2))
+        out.append(d >> 3)
+    elif dist <= 0x4000:
+        d = dist - 1
+        if length <= 33:
+            out.append(32 | (length - 2))
+        else:
+            lzo1x_write_length(out, 32, length - 33)
+        out.append((d & 63) << 2)
+        out.append(d >> 6)
+    else:
+        d = dist - 0x4000
+        k = (d & 0x4000) >> 11
+        if length <= 9:
+            out.append(16 | k | (length - 2))
+        else:
+            lzo1x_write_length(out, 16 | k, length - 9)
+        out.append((d & 63) << 2)
+        out.append((d >> 6) & 0xFF)
+    return None
+
+
+# candidates followed per position by lzo1x_compress for each level, level 1 is
+# LZO1X-1 (the last occurrence only, skipping faster through data that won't compress)
+lzoChainDepth = {1: 1, 2: 2, 3: 4, 4: 8, 5: 16, 6: 32, 7: 64, 8: 128, 9: 256}
+
+# uncompressed size of each block in an lzop file
+lzopBlockSize = 256 * 1024
+
+
+def lzo1x_match_length(src=b'', m=0, ip=0, end=0):
+    # length of the common run at m and ip, compared in blocks before bytes
+    n = 0
+    limit = end - ip
+    while n + 64 <= limit and src[m + n:m + n + 64] == src[ip + n:ip + n + 64]: n += 64
+    while n + 8 <= limit and src[m + n:m + n + 8] == src[ip + n:ip + n + 8]: n += 8
+    while n < limit and src[m + n] == src[ip + n]: n += 1
+    return n
+
+
+def lzo1x_compress(src=b'', level=1):
+    '''
+        LZO1X compressor, returns a raw stream that lzo1x_decompress reads back
+        matches are found through a table of the last position of every 4 byte
+        sequence, levels above 1 chain earlier positions too (see lzoChainDepth)
+        trading speed for ratio
+    '''
+    src = bytes(src)
+    n = len(src)
+    depth = lzoChainDepth.get(level, 1)
+    out = bytearray()
+    head = {}
+    chain = array.array('i', [-1]) * n if depth > 1 else None
+    ii = ip = 0
+    last = n - 4
+    while ip <= last:
+        key = src[ip:ip + 4]
+        cand = head.get(key, -1)
+        head[key] = ip
+        if chain != None: chain[ip] = cand
+
+        best = m = 0
+        k = depth
+        while cand >= 0 and k > 0 and ip - cand <= 0xBFFF:
+            l = lzo1x_match_length(src, cand, ip, n)
+            if l > best:
+                best = l
+                m = cand
+            if chain == None or best >= 128: break  # long enough, stop searching
+            cand = chain[cand]
+            k -= 1
+
+        if best < 4:
+            ip += 1 + ((ip - ii) >> 5) if chain == None else 1
+            continue
+
+        lzo1x_write_literals(out, src[ii:ip], len(out) == 0)
+        lzo1x_write_match(out, ip - m, best, ip - ii)
+        if chain != None:
+            for p in range(ip + 1, ip + best if ip + best <= last else last + 1):
+                key = src[p:p + 4]
+                chain[p] = head.get(key, -1)
+                head[key] = p
+        ip += best
+        ii = ip
+    lzo1x_write_literals(out, src[ii:n], len(out) == 0)
+    out += b'\x11\x00\x00'
+    return bytes(out)
+
+
+def lzop_pack(data=b'', level=1, blockSize=0):
+    '''
+        writes data as an lzop file of independently compressed blocks with
+        adler32 checksums of the uncompressed data
+    '''
+    if blockSize <= 0: blockSize = lzopBlockSize
+    be = getStructTable(False)
+    u8, u16, u32 = be[('byte', unsigned)], be[('short', unsigned)], be[('long', unsigned)]
+    flags = 0x03000001  # unix, adler32 of the decompressed blocks
+    hdr = (u16.pack(0x1040) + u16.pack(0x2080) + u16.pack(0x0940) + u8.pack(1) + u8.pack(level) +
+           u32.pack(flags) + u32.pack(0o100644) + u32.pack(0) + u32.pack(0) + u8.pack(0))
+    out = bytearray(lzopMagic)
+    out += hdr
+    out += u32.pack(zlib.adler32(hdr))
+    data = memoryview(data).cast('B')
+    for p in range(0, len(data), blockSize):
+        block = data[p:p + blockSize]
+        packed = lzo1x_compress(block, level)
+        if len(packed) >= len(block): packed = block
+        out += u32.pack(len(block)) + u32.pack(len(packed)) + u32.pack(zlib.adler32(block))
+        out += packed
+    out += u32.pack(0)
+    return out
+
+
+def lzo_pack(data=b'', container="raw", level=1):
+    '''
+        compresses data in a form lzo_unpack recognises
+        container: "raw" for a uint32 decompressed size and one LZO1X stream,
+        "lzop" for an lzop file
+    '''
+    if container == "lzop": return lzop_pack(data, level)
+    out = bytearray(getStructTable(True)[('long', unsigned)].pack(len(data)))
+    out += lzo1x_compress(data, level)
+    return out
+
+
+def lzo1x_synthesize(size=1024 * 1024, seed=1):
+    '''
+        generates a random LZO1X stream using every token form, for testing and
+        benchmarking without samples, returns (compressed, decompressed)
+    '''
+    rnd = random.Random(seed)
+    plain = bytearray()
+    packed = bytearray()
+    while len(plain) < size:
+        state = 0
+        if len(plain) < 4 or rnd.random() < 0.6:
+            n = rnd.choice((1, 2, 3, 4, 6, 9, 14, 20, 40, 300))
+            lits = bytes(rnd.randrange(32) for i in range(0, n))
+            lzo1x_write_literals(packed, lits, len(packed) == 0)
+            plain += lits
+            state = n
+
+        h = len(plain)
+        length = rnd.choice((3, 3, 4, 5, 8, 9, 12, 20, 33, 34, 80, 600))
+        r = rnd.random()
+        if state >= 1 and state <= 3 and r < 0.2:
+            length = 2
+            dist = rnd.randint(1, h if h < 0x400 else 0x400)
+        elif state >= 4 and r < 0.3 and h > 0xC00:
+            length = 3
+            dist = rnd.randint(0x801, 0xC00)
+        elif r < 0.5:
+            dist = rnd.randint(1, h if h < 16 else 16)  # overlapping runs
+        elif r < 0.9 or h <= 0x4000:
+            dist = rnd.randint(1, h if h < 0x4000 else 0x4000)
+        else:
+            dist = rnd.randint(0x4001, h if h < 0xBFFF else 0xBFFF)
+        lzo1x_write_match(packed, dist, length, state)
+        m = h - dist
+        if length <= dist:
+            plain += plain[m:m + length]
+        else:
+            plain += (plain[m:h] * (length // dist + 1))[0:length]
+    packed += b'\x11\x00\x00'
+    return (bytes(packed), bytes(plain))
+
+
+def lzo1x_selftest():
+    '''
+        round trips empty, tiny, incompressible and repetitive inputs through both
+        containers at levels 1 and 9, raises ReadError on the first mismatch
+        returns the number of cases checked. this is the command line's test,
+        tests/test_lzo1x.py checks each case separately
+    '''
+    rng = random.Random(0x534D32)
+    inputs = [
+        ("empty", b''),
+        ("tiny", b'a'),
+        ("tiny", b'2MS\x00'),
+        ("incompressible", bytes(rng.getrandbits(8) for i in range(70000))),
+        ("repetitive", b'\x00' * 300000),
+        ("repetitive", b'abc' * 100000),
+        ("mixed", lzo1x_synthesize(200000, 1)[1])
+        ]
+    count = 0
+    for name, data in inputs:
+        for level in (1, 9):
+            for container in ("raw", "lzop"):
+                packed = lzo_pack(data, container, level)
+                if container == "lzop":
+                    out = lzop_unpack(packed)
+                else:
+                    size = getStructTable(True)[('long', unsigned)].unpack_from(packed, 0)[0]
+                    out = lzo1x_decompress(packed[4:], size)
+                if out == None or bytes(out) != data:
+                    raise ReadError("lzo1x round trip failed, %s %i bytes, level %i, %s" % (
+                        name, len(data), level, container), 0, "lzo1x")
+                count += 1
+    return count
+
+
+def lzo1x_benchmark(size=4 * 1024 * 1024, repeat=3, level=1):
+    '''
+        times lzo1x_decompress on a synthetic stream and lzo1x_compress on its
+        output, the compressed data must decompress back bit exact
+        returns (decompress MB/s, compress MB/s)
+    '''
+    packed, plain = lzo1x_synthesize(size)
+    mb = len(plain) / (1024.0 * 1024.0)
+    best = 0.0
+    for i in range(0, repeat):
+        t = time.perf_counter()
+        out = lzo1x_decompress(packed, len(plain))
+        t = time.perf_counter() - t
+        if out != plain:
+            format("Error: \tlzo1x_decompress output mismatch\n")
+            return (0.0, 0.0)
+        if best == 0.0 or t < best: best = t
+    dmbs = mb / best if best > 0 else 0.0
+    format("lzo1x_decompress: \t% -> % bytes, % MB/s\n", (len(packed), len(plain), round(dmbs, 1)))
+
+    t = time.perf_counter()
+    repacked = lzo1x_compress(plain, level)
+    t = time.perf_counter() - t
+    cmbs = mb / t if t > 0 else 0.0
+    if lzo1x_decompress(repacked, len(plain)) != plain:
+        format("Error: \tlzo1x_compress round trip mismatch\n")
+        return (dmbs, 0.0)
+    format("lzo1x_compress: \tlevel %, % -> % bytes, % MB/s\n", (level, len(plain), len(repacked), round(cmbs, 1)))
+    return (dmbs, cmbs)
+
+
 class fopen:
     little_endian = True
     file = ""
     mode = 'rb'
     data = bytearray()
+    view = None
+    handle = None
     size = 0
     pos = 0
     isGood = False
-
-    def __init__(self, filename=None, mode='rb', isLittleEndian=True):
+    isMapped = False
+    isCompressed = False  # data was decompressed on open, packedSize is the size on disk
+    packedSize = 0
+    compress = ""  # lzo_pack container used by flush, "" writes uncompressed
+    level = 1
+    structs = getStructTable(True)
+    strict = False  # raise ReadError instead of returning zeros past the end
+    clean = True  # False once a damaged read was patched over instead of raising
+    deadline = 0.0  # time.perf_counter() limit, 0 for none
+    memLimit = 0  # bytes the parser may allocate, 0 for none
+    memUsed = 0
+
+    def __init__(self, filename=None, mode='rb', isLittleEndian=True, useMmap=None, strict=False):
+        # useMmap: True / False to force a backend, None picks mmap for files >= mmapThreshold
+        self.structs = getStructTable(isLittleEndian)
+        self.strict = strict
         if mode == 'rb':
             if filename != None and Path(filename).is_file():
-                self.data = open(filename, mode).read()
+                fsize = Path(filename).stat().st_size
+                if useMmap == None: useMmap = fsize >= mmapThreshold
+                if useMmap and fsize > 0:
+                    self.handle = open(filename, mode)
+                    self.data = mmap.mmap(self.handle.fileno(), 0, access=mmap.ACCESS_READ)
+                    self.isMapped = True
+                else:
+                    self.data = open(filename, mode).read()
+                    self.isMapped = False
+                self.view = memoryview(self.data)
                 self.size = len(self.data)
                 self.pos = 0
                 self.mode = mode
                 self.file = filename
                 self.little_endian = isLittleEndian
                 self.isGood = True
+                if autoDecompress and self.size > 8 and not bytes(self.view[0:4]) in knownMagics:
+                    self.unpack()
         else:
             self.file = filename
             self.mode = mode
@@ -1718,9 +2386,99 @@ class fopen:
             self.isGood = True
 
             s = open(self.file, 'w+b')
-            s.write(self.data)
+            if self.compress != "":
+                s.write(lzo_pack(self.data, self.compress, self.level))
+            else:
+                s.write(self.data)
             s.close()
 
+    def close(self):
+        # releases the file mapping, views handed out by readBuffer keep it alive until they are dropped
+        if self.view != None:
+            self.view.release()
+            self.view = None
+        if self.isMapped:
+            try:
+                self.data.close()
+            except BufferError:
+                pass
+            self.handle.close()
+            self.handle = None
+            self.isMapped = False
+        return None
+
+    def unpack(self):
+        # replaces the buffer with its decompressed contents if it's lzo compressed
+        try:
+            out = lzo_unpack(self.view)
+        except ReadError as err:
+            if self.strict: raise ReadError(err.message, err.offset, self.file)
+            format("Warning: \tFailed to decompress {%}, %\n", (self.file, err.message))
+            self.clean = False
+            out = None
+        if out != None:
+            self.packedSize = self.size
+            self.close()
+            self.data = out
+            self.view = memoryview(self.data)
+            self.size = len(self.data)
+            self.pos = 0
+            self.isCompressed = True
+        return out != None
+
+    def read_buffer(self, size):
+        # returns a zero-copy view of the next size bytes
+        buf = self.view[0:0] if self.view != None else memoryview(b'')
+        if self.size > 0 and size > 0 and self.pos + size <= self.size:
+            buf = self.view[self.pos:self.pos + size]
+            self.pos += size
+        elif size > 0:
+            if self.strict: self.fail("Read of %i bytes past the end" % size)
+            self.clean = False
+        return buf
+
+    def find(self, sub, start=0, end=-1):
+        # bytes.find on the underlying buffer, works the same on a mapped file
+        if end < 0: end = self.size
+        return self.data.find(sub, start, end)
+
+    def fail(self, message=""):
+        raise ReadError(message, self.pos, self.file)
+
+    def setBudget(self, seconds=0.0, memory=0):
+        # limits the time and memory the parse may take, checked by check_budget / allocate
+        self.deadline = (time.perf_counter() + seconds) if seconds > 0 else 0.0
+        self.memLimit = memory
+        self.memUsed = 0
+        return None
+
+    def check_budget(self):
+        if self.deadline > 0 and time.perf_counter() > self.deadline:
+            self.fail("Parse time budget exceeded")
+        return None
+
+    def allocate(self, nbytes=0, what="buffer"):
+        # accounts for memory about to be allocated for decoded data
+        self.memUsed += nbytes
+        if self.memLimit > 0 and self.memUsed > self.memLimit:
+            self.fail("Memory budget exceeded by %s (%i / %i bytes)" % (what, self.memUsed, self.memLimit))
+        self.check_budget()
+        return None
+
+    def check_size(self, nbytes=0, what="block"):
+        # True if nbytes can be read from pos, raises instead in strict mode
+        valid = nbytes >= 0 and self.pos + nbytes <= self.size
+        if not valid:
+            if self.strict: self.fail("%s needs %i bytes, %i left" % (what, nbytes, self.size - self.pos))
+            self.clean = False
+        return valid
+
+    def find_nonzero(self, start=0, end=-1):
+        # offset of the first non-zero byte in [start, end), or end if it's all padding
+        if end < 0 or end > self.size: end = self.size
+        if start >= end: return end
+        return end - len(bytes(self.view[start:end]).lstrip(b'\x00'))
+
     def read_and_unpack(self, unpack, size):
         '''
           Charactor, Byte-order
@@ -1743,33 +2501,104 @@ class fopen:
         '''
         value = 0
         if self.size > 0 and self.pos + size <= self.size:
-            value = struct.unpack_from(unpack, self.data, self.pos)[0]
+            st = struct_cache.get(unpack)
+            if st == None:
+                st = struct.Struct(unpack)
+                struct_cache[unpack] = st
+            value = st.unpack_from(self.data, self.pos)[0]
             self.pos += size
+        else:
+            if self.strict: self.fail("Read of %i bytes past the end" % size)
+            self.clean = False
         return value
 
+    def read_array(self, fmt='B', count=0):
+        # reads count values of a struct format character in one slice of the buffer,
+        # returns a numpy array in native byte order (or array.array if numpy is missing)
+        itemsize = struct.calcsize(fmt)
+        nbytes = itemsize * count
+        valid = count > 0 and self.size > 0 and self.pos + nbytes <= self.size
+        if not valid and count > 0:
+            if self.strict: self.fail("Read of %i x '%s' past the end" % (count, fmt))
+            self.clean = False
+        if np != None:
+            dt = np.dtype(('<' if self.little_endian else '>') + fmt)
+            if valid:
+                arr = np.frombuffer(self.data, dtype=dt, count=count, offset=self.pos)
+                self.pos += nbytes
+            else:
+                arr = np.zeros(count if count > 0 else 0, dtype=dt)
+            return arr.astype(dt.newbyteorder('='), copy=False)
+        arr = array.array(fmt)
+        if valid:
+            arr.frombytes(self.view[self.pos:self.pos + nbytes])
+            if self.little_endian != (sys.byteorder == 'little'): arr.byteswap()
+            self.pos += nbytes
+        elif count > 0:
+            arr.frombytes(bytes(nbytes))
+        return arr
+
+    def read_struct(self, st):
+        # unpacks a compiled struct.Struct, returns zeros if it would read past the end
+        if self.size > 0 and self.pos + st.size <= self.size:
+            value = st.unpack_from(self.data, self.pos)
+            self.pos += st.size
+            return value
+        if self.strict: self.fail("Read of %i bytes past the end" % st.size)
+        self.clean = False
+        return st.unpack(bytes(st.size))
+
     def pack_and_write(self, pack, size, value):
         if self.pos + size > self.size:
             self.data.extend(b'\x00' * ((self.pos + size) - self.size))
             self.size = self.pos + size
         try:
-            struct.pack_into(pack, self.data, self.pos, value)
+            st = struct_cache.get(pack)
+            if st == None:
+                st = struct.Struct(pack)
+                struct_cache[pack] = st
+            st.pack_into(self.data, self.pos, value)
         except:
             # print('Pos:\t%i / %i (buf:%i) [val:%i:%i:%s]' % (self.pos, self.size, len(self.data), value, size, pack))
             pass
         self.pos += size
         return None
 
+    def write_struct(self, st, *values):
+        # packs values with a compiled struct.Struct at the current position
+        if self.pos + st.size > self.size:
+            self.data.extend(b'\x00' * ((self.pos + st.size) - self.size))
+            self.size = self.pos + st.size
+        try:
+            st.pack_into(self.data, self.pos, *values)
+        except:
+            pass
+        self.pos += st.size
+        return None
+
+    def write_buffer(self, buf):
+        # writes raw bytes at the current position
+        size = len(buf)
+        if self.pos + size > self.size:
+            self.data.extend(b'\x00' * ((self.pos + size) - self.size))
+            self.size = self.pos + size
+        self.data[self.pos:self.pos + size] = buf
+        self.pos += size
+        return None
+
     def set_pointer(self, offset):
         self.pos = offset
         return None
 
     def set_endian(self, isLittle=True):
         self.little_endian = isLittle
+        self.structs = getStructTable(isLittle)
         return isLittle
 
 
 def fclose(bitStream=fopen()):
     bitStream.flush()
+    bitStream.close()
     bitStream.isGood = False
 
 
@@ -1788,172 +2617,197 @@ def ftell(bitStream=fopen()):
 
 
 def readByte(bitStream=fopen(), isSigned=0):
-    fmt = 'b' if isSigned == 0 else 'B'
-    return (bitStream.read_and_unpack(fmt, 1))
+    return bitStream.read_struct(bitStream.structs[('byte', isSigned)])[0]
 
 
 def readShort(bitStream=fopen(), isSigned=0):
-    fmt = '>' if not bitStream.little_endian else '<'
-    fmt += 'h' if isSigned == 0 else 'H'
-    return (bitStream.read_and_unpack(fmt, 2))
+    return bitStream.read_struct(bitStream.structs[('short', isSigned)])[0]
 
 
 def readLong(bitStream=fopen(), isSigned=0):
-    fmt = '>' if not bitStream.little_endian else '<'
-    fmt += 'i' if isSigned == 0 else 'I'
-    return (bitStream.read_and_unpack(fmt, 4))
+    return bitStream.read_struct(bitStream.structs[('long', isSigned)])[0]
 
 
 def readLongLong(bitStream=fopen(), isSigned=0):
-    fmt = '>' if not bitStream.little_endian else '<'
-    fmt += 'q' if isSigned == 0 else 'Q'
-    return (bitStream.read_and_unpack(fmt, 8))
+    return bitStream.read_struct(bitStream.structs[('longlong', isSigned)])[0]
 
 
 def readFloat(bitStream=fopen()):
-    fmt = '>f' if not bitStream.little_endian else '<f'
-    return (bitStream.read_and_unpack(fmt, 4))
+    return bitStream.read_struct(bitStream.structs[('float', signed)])[0]
 
 
 def readDouble(bitStream=fopen()):
-    fmt = '>d' if not bitStream.little_endian else '<d'
-    return (bitStream.read_and_unpack(fmt, 8))
+    return bitStream.read_struct(bitStream.structs[('double', signed)])[0]
 
 
-def readHalf(bitStream=fopen()):
-    uint16 = bitStream.read_and_unpack('>H' if not bitStream.little_endian else '<H', 2)
+# decode halves with the original bit twiddle, which maps zero, denormals and inf/nan wrong
+# (0x0000 reads as 2^-15) but matches files imported by older versions of this script
+legacyHalfFloats = False
+
+half_u16 = struct.Struct('<H')
+half_f16 = struct.Struct('<e')
+half_u32 = struct.Struct('<I')
+half_f32 = struct.Struct('<f')
+
+
+def halfToFloat(uint16=0, legacy=None):
+    if legacy == None: legacy = legacyHalfFloats
+    if not legacy:
+        return half_f16.unpack(half_u16.pack(uint16 & 0xFFFF))[0]
     uint32 = (
             (((uint16 & 0x03FF) << 0x0D) | ((((uint16 & 0x7C00) >> 0x0A) + 0x70) << 0x17)) |
             (((uint16 >> 0x0F) & 0x00000001) << 0x1F)
         )
-    return struct.unpack('f', struct.pack('I', uint32))[0]
+    return half_f32.unpack(half_u32.pack(uint32))[0]
+
+
+def readHalf(bitStream=fopen()):
+    if not legacyHalfFloats:
+        return bitStream.read_struct(bitStream.structs[('half', signed)])[0]
+    return halfToFloat(bitStream.read_struct(bitStream.structs[('short', unsigned)])[0], True)
+
+
+def halfToFloatArray(raw=[], legacy=None):
+    # converts an array of uint16 half floats to float32 in one go
+    if legacy == None: legacy = legacyHalfFloats
+    if np != None:
+        if not legacy:
+            return np.asarray(raw, dtype=np.uint16).view(np.float16).astype(np.float32)
+        u = np.asarray(raw, dtype=np.uint32)
+        u = (((u & 0x03FF) << 0x0D) | ((((u & 0x7C00) >> 0x0A) + 0x70) << 0x17)) | (((u >> 0x0F) & 0x01) << 0x1F)
+        return u.view(np.float32)
+    if not legacy:
+        raw = array.array('H', raw)
+        return array.array('f', struct.unpack('=' + str(len(raw)) + 'e', raw.tobytes()))
+    return array.array('f', map(lambda h: halfToFloat(h, True), raw))
+
+
+def readByteArray(bitStream=fopen(), count=0, isSigned=0):
+    # bulk readers, return count values as an array and advance the stream
+    return bitStream.read_array(struct_types['byte'][isSigned], count)
+
+
+def readShortArray(bitStream=fopen(), count=0, isSigned=0):
+    return bitStream.read_array(struct_types['short'][isSigned], count)
+
+
+def readLongArray(bitStream=fopen(), count=0, isSigned=0):
+    return bitStream.read_array(struct_types['long'][isSigned], count)
+
+
+def readFloatArray(bitStream=fopen(), count=0):
+    return bitStream.read_array('f', count)
+
+
+def readHalfArray(bitStream=fopen(), count=0):
+    if np != None and not legacyHalfFloats:
+        return bitStream.read_array('e', count).astype(np.float32)
+    return halfToFloatArray(bitStream.read_array('H', count))
+
+
+def readBytes(bitStream=fopen(), count=1, isSigned=0):
+    # reads count values in one unpack, returns a tuple
+    return bitStream.read_struct(getStruct(struct_types['byte'][isSigned], count, bitStream.little_endian))
+
+
+def readShorts(bitStream=fopen(), count=1, isSigned=0):
+    return bitStream.read_struct(getStruct(struct_types['short'][isSigned], count, bitStream.little_endian))
+
+
+def readLongs(bitStream=fopen(), count=1, isSigned=0):
+    return bitStream.read_struct(getStruct(struct_types['long'][isSigned], count, bitStream.little_endian))
+
+
+def readFloats(bitStream=fopen(), count=1):
+    return bitStream.read_struct(getStruct('f', count, bitStream.little_endian))
+
+
+def readHalfs(bitStream=fopen(), count=1):
+    if not legacyHalfFloats:
+        return bitStream.read_struct(getStruct('e', count, bitStream.little_endian))
+    raw = bitStream.read_struct(getStruct('H', count, bitStream.little_endian))
+    return tuple(map(lambda h: halfToFloat(h, True), raw))
 
 
 def readString(bitStream=fopen(), length=0):
     string = ''
     pos = bitStream.pos
     lim = length if length != 0 else bitStream.size - bitStream.pos
-    for i in range(0, lim):
-        b = bitStream.read_and_unpack('B', 1)
-        if b != 0:
-            string += chr(b)
-        else:
-            if length > 0:
-                bitStream.set_pointer(pos + length)
-            break
+    if lim > bitStream.size - pos: lim = bitStream.size - pos
+    end = pos
+    if lim > 0:
+        end = bitStream.find(b'\x00', pos, pos + lim)
+        if end < 0: end = pos + lim
+        string = bytes(bitStream.view[pos:end]).decode('latin-1')
+    if length > 0:
+        bitStream.set_pointer(pos + length)
+    elif end < bitStream.size:
+        bitStream.set_pointer(end + 1)
+    else:
+        bitStream.set_pointer(end)
     return string
 
 
-def writeByte(bitStream=fopen(), value=0):
-    bitStream.pack_and_write('B', 1, int(value))
+def readBuffer(bitStream=fopen(), length=0):
+    # slice of the file without copying, use bytes() on it if a copy is needed
+    return bitStream.read_buffer(length)
+
+
+def writeByte(bitStream=fopen(), value=0, isSigned=unsigned):
+    bitStream.write_struct(bitStream.structs[('byte', isSigned)], int(value))
     return None
 
 
-def writeShort(bitStream=fopen(), value=0):
-    fmt = '>H' if not bitStream.little_endian else '<H'
-    bitStream.pack_and_write(fmt, 2, int(value))
+def writeShort(bitStream=fopen(), value=0, isSigned=unsigned):
+    bitStream.write_struct(bitStream.structs[('short', isSigned)], int(value))
     return None
 
 
-def writeLong(bitStream=fopen(), value=0):
-    fmt = '>I' if not bitStream.little_endian else '<I'
-    bitStream.pack_and_write(fmt, 4, int(value))
+def writeLong(bitStream=fopen(), value=0, isSigned=unsigned):
+    bitStream.write_struct(bitStream.structs[('long', isSigned)], int(value))
     return None
 
 
 def writeFloat(bitStream=fopen(), value=0.0):
-    fmt = '>f' if not bitStream.little_endian else '<f'
-    bitStream.pack_and_write(fmt, 4, value)
+    bitStream.write_struct(bitStream.structs[('float', signed)], value)
     return None
 
 
-def writeLongLong(bitStream=fopen(), value=0):
-    fmt = '>Q' if not bitStream.little_endian else '<Q'
-    bitStream.pack_and_write(fmt, 8, value)
+def writeLongLong(bitStream=fopen(), value=0, isSigned=unsigned):
+    bitStream.write_struct(bitStream.structs[('longlong', isSigned)], int(value))
     return None
 
 
 def writeDoube(bitStream=fopen(), value=0.0):
-    fmt = '>d' if not bitStream.little_endian else '<d'
-    bitStream.pack_and_write(fmt, 8, value)
+    bitStream.write_struct(bitStream.structs[('double', signed)], value)
     return None
 
-def writeHalf(bitStream=fopen(), value=0.0):
-    # https://galfar.vevb.net/wp/2011/16bit-half-float-in-pascaldelphi/
-
-    result = 0
-    Src = int(struct.pack("f", value))
-
-    # Extract sign, exponentonent, and mantissa from Single number
-    Sign = Src << 31
-    exponent = ((Src & 0x7F800000) << 23) - 127 + 15
-    Mantissa = Src & 0x007FFFFF
-    if exponent >= 0 and exponent <= 30:
-        # Simple case - round the significand and combine it with the sign and exponentonent
-        result = (Sign >> 15) | ((exponent >> 10) | ((Mantissa + 0x00001000) << 13))
-
-    else:
-        if Src == 0:
-            # Input float is zero - return zero
-            result = 0
-
-        else:
-            # Difficult case - lengthy conversion
-            if exponent <= 0:
-                if exponent <= -10:
-                    # Input float's value is less than HalfMin, return zero
-                    result = 0
-
-                else:
-                    # Float is a normalized Single whose magnitude is less than HalfNormMin.
-                    # We convert it to denormalized half.
-                    Mantissa = (Mantissa | 0x00800000) << (1 - exponent)
-                    # Round to nearest
-                    if (Mantissa | 0x00001000) >= 0:
-                        Mantissa = Mantissa + 0x00002000
-                    # Assemble Sign and Mantissa (exponent is zero to get denormalized number)
-                    result = (Sign >> 15) | (Mantissa << 13)
-
-
-            else:
-                if exponent == 255 - 127 + 15:
-                    if Mantissa == 0:
-                        # Input float is infinity, create infinity half with original sign
-                        result = (Sign >> 15) or 0x7C00
 
-                    else:
-                        # Input float is NaN, create half NaN with original sign and mantissa
-                        result = (Sign >> 15) | (0x7C00 | (Mantissa << 13))
+def writeFloats(bitStream=fopen(), values=[]):
+    # writes a record of floats in one pack
+    bitStream.write_struct(getStruct('f', len(values), bitStream.little_endian), *values)
+    return None
 
 
-                else:
-                    # exponent is > 0 so input float is normalized Single
-                    # Round to nearest
-                    if (Mantissa & 0x00001000) >= 0:
-                        Mantissa = Mantissa + 0x00002000
-                        if (Mantissa & 0x00800000) >= 0:
-                            Mantissa = 0
-                            exponent = exponent + 1
-
-                    if exponent >= 30:
-                        # exponentonent overflow - return infinity half
-                        result = (Sign >> 15) | 0x7C00
+def writeBuffer(bitStream=fopen(), buf=b''):
+    bitStream.write_buffer(buf)
+    return None
 
-                    else:
-                        # Assemble normalized half
-                        result = (Sign >> 15) | ((exponent >> 10) | (Mantissa << 13))
-    self.writeShort(bitStream, result, unsigned)
+def writeHalf(bitStream=fopen(), value=0.0):
+    # IEEE half, rounds to nearest even, out of range values become infinity
+    try:
+        h = half_u16.unpack(half_f16.pack(value))[0]
+    except OverflowError:
+        h = 0xFC00 if value < 0 else 0x7C00
+    writeShort(bitStream, h, unsigned)
     return None
 
 
 def writeString(bitStream=fopen(), string="", length=0):
     strLen = len(string)
     if length == 0: length = strLen + 1
-    for i in range(0, length):
-        if i < strLen:
-            bitStream.pack_and_write('b', 1, ord(string[i]))
-        else:
-            bitStream.pack_and_write('B', 1, 0)
+    buf = string[0:length].encode('latin-1', 'replace')
+    bitStream.write_buffer(buf + b'\x00' * (length - len(buf)))
     return None
 
 
@@ -1962,14 +2816,14 @@ def mesh_validate(vertices=[], faces=[]):
     # blender will crash if the mesh data is bad
 
     # Check an Array was given
-    result = (type(faces).__name__ == "tuple" or type(faces).__name__ == "list")
+    result = type(faces).__name__ in ("tuple", "list", "ndarray")
     if result == True:
 
         # Check the the array is Not empty
         if len(faces) > 0:
 
             # check that the face is a vector
-            if (type(faces[0]).__name__ == "tuple" or type(faces[0]).__name__ == "list"):
+            if type(faces[0]).__name__ in ("tuple", "list", "ndarray"):
 
                 # Calculate the Max face index from supplied vertices
                 face_min = 0
@@ -1980,10 +2834,11 @@ def mesh_validate(vertices=[], faces=[]):
                     for side in face:
 
                         # Check face index is in range
-                        if side < face_min and side > face_max:
+                        if side < face_min or side > face_max:
                             print("MeshValidation: \tFace Index Out of Range:\t[%i / %i]" % (side, face_max))
                             result = False
                             break
+                    if not result: break
             else:
                 print("MeshValidation: \tFace In Array is Invalid")
                 result = False
@@ -1995,6 +2850,99 @@ def mesh_validate(vertices=[], faces=[]):
     return result
 
 
+def mesh_attribute(msh=None, name="", values=[]):
+    # adds a per vertex FLOAT (n) or FLOAT_VECTOR (n, 3) attribute filled in one foreach_set
+    if np != None:
+        values = np.asarray(values, dtype=np.float32)
+        vector = values.ndim > 1
+        layer = msh.attributes.new(name, 'FLOAT_VECTOR' if vector else 'FLOAT', 'POINT')
+        layer.data.foreach_set("vector" if vector else "value", values.ravel())
+    else:
+        vector = len(values) > 0 and type(values[0]).__name__ in ("tuple", "list")
+        layer = msh.attributes.new(name, 'FLOAT_VECTOR' if vector else 'FLOAT', 'POINT')
+        for i in range(0, len(values)):
+            if vector: layer.data[i].vector = values[i]
+            else: layer.data[i].value = values[i]
+    return layer
+
+
+def mesh_sanitize(numVerts=0, faceArray=[]):
+    '''
+        array version of mesh_validate for an (n, corners) face array, finds faces
+        with an index out of range, degenerate faces that use a vertex twice and
+        duplicates of an earlier face (the same vertices in any order)
+        returns (mask of the faces to keep, {"range": n, "degenerate": n, "duplicate": n})
+    '''
+    bad = ((faceArray < 0) | (faceArray >= numVerts)).any(axis=1)
+    counts = {"range": int(bad.sum()), "degenerate": 0, "duplicate": 0}
+    if len(faceArray) == 0: return (~bad, counts)
+
+    sortedFaces = np.sort(faceArray, axis=1)
+    degenerate = (sortedFaces[:, 1:] == sortedFaces[:, :-1]).any(axis=1) & ~bad
+    counts["degenerate"] = int(degenerate.sum())
+    bad |= degenerate
+
+    # the first of each set of faces sharing their vertices is kept
+    good = np.flatnonzero(~bad)
+    bits = max(1, int(numVerts - 1).bit_length())
+    if bits * faceArray.shape[1] <= 63:
+        # pack each face into one int64, much faster to sort than rows
+        rows = np.zeros(len(good), dtype=np.int64)
+        for i in range(0, faceArray.shape[1]):
+            rows = (rows << bits) | sortedFaces[good, i]
+        first = np.unique(rows, return_index=True)[1]
+    else:
+        first = np.unique(sortedFaces[good], axis=0, return_index=True)[1]
+    keep = np.zeros(len(faceArray), dtype=bool)
+    keep[good[first]] = True
+    counts["duplicate"] = len(good) - len(first)
+    return (keep, counts)
+
+
+def mesh_fill(msh=None, vertArray=[], faceArray=[]):
+    # fills an empty mesh from a float32 (n, 3) vertex array and an int32 (n, corners)
+    # face array, a few foreach_set calls in place of from_pydata's python loops
+    numFaces, corners = faceArray.shape
+    msh.vertices.add(len(vertArray))
+    msh.vertices.foreach_set("co", np.ascontiguousarray(vertArray, dtype=np.float32).ravel())
+    msh.loops.add(numFaces * corners)
+    msh.loops.foreach_set("vertex_index", np.ascontiguousarray(faceArray, dtype=np.int32).ravel())
+    msh.polygons.add(numFaces)
+    msh.polygons.foreach_set("loop_start", np.arange(0, numFaces * corners, corners, dtype=np.int32))
+    try:
+        msh.polygons.foreach_set("loop_total", np.full(numFaces, corners, dtype=np.int32))
+    except (AttributeError, TypeError, RuntimeError):
+        pass  # read only since blender 4.0, where it follows from loop_start
+    msh.update(calc_edges=True)
+    return None
+
+
+def mesh_colours(msh=None, colours=[], domain='POINT', name="Col"):
+    # adds a colour attribute filled in one foreach_set, colours are (r, g, b[, a])
+    # for each vertex (POINT) or face corner (CORNER)
+    if hasattr(msh, "color_attributes"):
+        layer = msh.color_attributes.new(name, 'FLOAT_COLOR', domain)
+    else:
+        layer = msh.vertex_colors.new(name=name)  # before blender 3.2, always per corner
+    count = len(layer.data)
+    if np != None:
+        colArray = np.ones((len(colours), 4), dtype=np.float32)
+        if len(colours) > 0:
+            c = np.asarray(colours, dtype=np.float32)
+            colArray[:, 0:c.shape[1]] = c[:, 0:4]
+        if domain == 'POINT' and count != len(colArray):
+            # per corner layer, look up each corner's vertex
+            loopVerts = np.zeros(len(msh.loops), dtype=np.int32)
+            msh.loops.foreach_get("vertex_index", loopVerts)
+            colArray = colArray[loopVerts]
+        layer.data.foreach_set("color", colArray.ravel())
+    else:
+        for i in range(0, count):
+            c = colours[msh.loops[i].vertex_index if domain == 'POINT' and count != len(colours) else i]
+            layer.data[i].color = (c[0], c[1], c[2], c[3] if len(c) > 3 else 1.0)
+    return layer
+
+
 def mesh(
         vertices=[],
         faces=[],
@@ -2007,8 +2955,17 @@ def mesh(
         flipAxis=False,
         obj_name="Object",
         lay_name='',
-        position=(0.0, 0.0, 0.0)
+        position=(0.0, 0.0, 0.0),
+        dispColour="loop",
+        repair=True,
+        validate=None,
+        attributes={}
 ):
+    # dispColour: without colours, "loop" fills a vertex colour with a random colour,
+    # "object" sets the object colour to it instead and "none" skips it
+    # repair: drop faces mesh_sanitize rejects, otherwise the mesh isn't built
+    # validate: run blender's msh.validate(), None only runs it when the faces weren't sanitized
+    # attributes: {name: per vertex floats or float vectors} stored as mesh attributes
     #
     # This function is pretty, ugly
     # imports the mesh into blender
@@ -2042,7 +2999,21 @@ def mesh(
     # Apply vertex scaling
     # mscale *= bpy.context.scene.unit_settings.scale_length
     vertArray = []
-    if len(vertices) > 0:
+    faceArray = []
+    useArrays = False
+    if np != None:
+        # arrays are filled with foreach_set, the scale and axis flip are one multiply
+        vertArray = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        if flipAxis:
+            vertArray = vertArray[:, (0, 2, 1)] * np.array([mscale, -mscale, mscale], dtype=np.float32)
+        elif mscale != 1.0:
+            vertArray = vertArray * np.float32(mscale)
+        try:
+            faceArray = np.asarray(faces, dtype=np.int32) if len(faces) > 0 else np.zeros((0, 3), dtype=np.int32)
+            useArrays = faceArray.ndim == 2
+        except ValueError:
+            pass  # mixed polygon sizes go through from_pydata
+    elif len(vertices) > 0:
         vertArray = [[float] * 3] * len(vertices)
         if flipAxis:
             for v in range(0, len(vertices)):
@@ -2060,86 +3031,88 @@ def mesh(
                 )
 
     # assign data from arrays
-    if not mesh_validate(vertArray, faces):
+    result = True
+    cornerKeep = slice(None)
+    numCorners = 0
+    if useArrays:
+        numCorners = faceArray.size
+        keep, counts = mesh_sanitize(len(vertArray), faceArray)
+        if len(keep) > 0 and not keep.all():
+            format("MeshValidation: \t%: % faces out of range, % degenerate, % duplicate\n", (
+                obj_name, counts["range"], counts["degenerate"], counts["duplicate"]))
+            if repair:
+                # per face and per corner arrays below follow the faces that are left
+                if len(materialIDs) == len(faceArray): materialIDs = [m for m, k in zip(materialIDs, keep) if k]
+                cornerKeep = np.repeat(keep, faceArray.shape[1])
+                faceArray = faceArray[keep]
+                faces = faceArray
+            else:
+                result = False
+    else:
+        result = mesh_validate(vertArray, faces)
+
+    if not result:
         # Erase Mesh
         msh.user_clear()
         bpy.data.meshes.remove(msh)
         print("Mesh Deleted!")
         return None
 
-    msh.from_pydata(vertArray, [], faces)
+    if useArrays:
+        mesh_fill(msh, vertArray, faceArray)
+    else:
+        msh.from_pydata(toList(vertArray), [], toList(faces))
+        numCorners = len(msh.loops)
 
     # set surface to smooth
     msh.polygons.foreach_set("use_smooth", [True] * len(msh.polygons))
 
-    # Set Normals
+    # Set Normals, per vertex or per face corner if there's one for each
     if len(faces) > 0:
         if len(normals) > 0:
-            msh.use_auto_smooth = True
-            if len(normals) == (len(faces) * 3):
-                msh.normals_split_custom_set(normals)
+            if hasattr(msh, "use_auto_smooth"): msh.use_auto_smooth = True  # gone in blender 4.1
+            if np != None:
+                normArray = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+                if flipAxis: normArray = normArray[:, (0, 2, 1)] * np.array([1.0, -1.0, 1.0], dtype=np.float32)
+            elif flipAxis:
+                normArray = [(n[0], -n[2], n[1]) for n in normals]
             else:
-                normArray = [[float] * 3] * (len(faces) * 3)
-                if flipAxis:
-                    for i in range(0, len(faces)):
-                        for v in range(0, 3):
-                            normArray[(i * 3) + v] = (
-                                [normals[faces[i][v]][0],
-                                 -normals[faces[i][v]][2],
-                                 normals[faces[i][v]][1]]
-                            )
-                else:
-                    for i in range(0, len(faces)):
-                        for v in range(0, 3):
-                            normArray[(i * 3) + v] = (
-                                [normals[faces[i][v]][0],
-                                 normals[faces[i][v]][1],
-                                 normals[faces[i][v]][2]]
-                            )
-                msh.normals_split_custom_set(normArray)
-
-        # create texture corrdinates
-        # print("tverts ", len(tverts))
-        # this is just a hack, i just add all the UVs into the same space <<<
-        if len(tverts) > 0:
+                normArray = normals
+            if len(normArray) != len(vertArray) and len(normArray) == numCorners:
+                msh.normals_split_custom_set(normArray[cornerKeep] if useArrays else normArray)
+            else:
+                msh.normals_split_custom_set_from_vertices(normArray)
+
+        # create texture corrdinates, a layer for each set
+        # each set is per vertex, or per face corner if it has one uv for each
+        for uvs in tverts:
+            if len(uvs) == 0: continue
             uvw = msh.uv_layers.new()
-            # if len(tverts) == (len(faces) * 3):
-            #    for v in range(0, len(faces) * 3):
-            #        msh.uv_layers[uvw.name].data[v].uv = tverts[v]
-            # else:
-            uvwArray = [[float] * 2] * len(tverts[0])
-            for i in range(0, len(tverts[0])):
-                uvwArray[i] = [0.0, 0.0]
-
-            for v in range(0, len(tverts[0])):
-                for i in range(0, len(tverts)):
-                    uvwArray[v][0] += tverts[i][v][0]
-                    uvwArray[v][1] += 1.0 - tverts[i][v][1]
-
-            for i in range(0, len(faces)):
-                for v in range(0, 3):
-                    msh.uv_layers[uvw.name].data[(i * 3) + v].uv = (
-                        uvwArray[faces[i][v]][0],
-                        uvwArray[faces[i][v]][1]
-                    )
+            if useArrays:
+                uvArray = np.asarray(uvs, dtype=np.float32)[:, 0:2]  # [u, v] or [u, v, w]
+                if len(uvArray) != len(vertArray) and len(uvArray) == numCorners:
+                    loopArray = uvArray[cornerKeep].copy()
+                else:
+                    loopArray = uvArray[faceArray.ravel()]
+                loopArray[:, 1] = 1.0 - loopArray[:, 1]
+                uvw.data.foreach_set("uv", loopArray.ravel())
+            else:
+                for i in range(0, len(msh.loops)):
+                    uv = uvs[msh.loops[i].vertex_index]
+                    uvw.data[i].uv = (uv[0], 1.0 - uv[1])
 
-        # create vertex colours
+        # create vertex colours, per vertex or per face corner if there's one for each
         if len(colours) > 0:
-            col = msh.vertex_colors.new()
-            if len(colours) == (len(faces) * 3):
-                for v in range(0, len(faces) * 3):
-                    msh.vertex_colors[col.name].data[v].color = colours[v]
+            if len(colours) != len(vertArray) and len(colours) == numCorners:
+                mesh_colours(msh, np.asarray(colours)[cornerKeep] if useArrays else colours, 'CORNER')
             else:
-                colArray = [[float] * 4] * (len(faces) * 3)
-                for i in range(0, len(faces)):
-                    for v in range(0, 3):
-                        msh.vertex_colors[col.name].data[(i * 3) + v].color = colours[faces[i][v]]
-        else:
+                mesh_colours(msh, colours, 'POINT')
+        elif dispColour == "loop":
             # Use colours to make a random display
-            col = msh.vertex_colors.new()
-            random_col = rancol4()
-            for v in range(0, len(faces) * 3):
-                msh.vertex_colors[col.name].data[v].color = random_col
+            mesh_colours(msh, [rancol4()] * len(vertArray), 'POINT')
+
+    for name, values in attributes.items():
+        if len(values) == len(vertArray): mesh_attribute(msh, name, values)
 
     # Create Face Maps?
     # msh.face_maps.new()
@@ -2149,8 +3122,10 @@ def mesh(
     # However the check will throw false positives so
     # an additional or a replacement valatiation function
     # would be required
+    # mesh_sanitize already covers this for the faces it checked
 
-    if msh.validate(clean_customdata=False):
+    if validate == None: validate = not useArrays
+    if validate and msh.validate(clean_customdata=False):
         print("Warning, Blender Deleted (" + obj_name + "), reason unspecified, likely empty")
 
     # Update Mesh
@@ -2159,6 +3134,7 @@ def mesh(
     # Assign Mesh to Object
     obj = bpy.data.objects.new(obj_name, msh)
     obj.location = position
+    if len(colours) == 0 and dispColour == "object": obj.color = rancol4()
     # obj.name = obj.name.replace(".", "_")
 
     for i in range(0, len(materials)):
@@ -2262,6 +3238,9 @@ class fmtSM2_Bone:  # 36 Bytes or:32 bytes if in the SKIN file
     '''float[16]'''
     matrix = matrix3()
 
+    # position, rotation, unk006, unk007 of the SM2 record, per endian
+    sm2_struct = {True: struct.Struct('<7f2H'), False: struct.Struct('>7f2H')}
+
     def asMat4x3(self):
         # ((self.matrix[0][0] + self.matrix[0][3], self.matrix[0][1] + self.matrix[0][3], self.matrix[0][2] + self.matrix[0][3]), (self.matrix[1][0] + self.matrix[1][3], self.matrix[1][1] + self.matrix[1][3], self.matrix[1][2] + self.matrix[1][3]), (self.matrix[2][0] + self.matrix[2][3], self.matrix[2][1] + self.matrix[2][3], self.matrix[2][2] + self.matrix[2][3]), (self.matrix[3][0] * self.matrix[3][3], self.matrix[3][1] * self.matrix[3][3], self.matrix[3][2] * self.matrix[3][3]))
         return self.matrix
@@ -2269,14 +3248,14 @@ class fmtSM2_Bone:  # 36 Bytes or:32 bytes if in the SKIN file
     def read(self, f=fopen(), type=0):
         if type == 0x00534D32:
             self.name = ""
-            for i in range(0, 4):
-                b = readByte(f, unsigned)
+            for b in readBytes(f, 4, unsigned):
                 if b > 0: self.name += bit.IntAsChar(b)
 
-            self.position = [readFloat(f), readFloat(f), readFloat(f)]
-            self.rotation = [readFloat(f), readFloat(f), readFloat(f), readFloat(f)]
-            self.unk006 = readShort(f, unsigned)
-            self.unk007 = readShort(f, unsigned)
+            r = f.read_struct(fmtSM2_Bone.sm2_struct[f.little_endian])
+            self.position = list(r[0:3])
+            self.rotation = list(r[3:7])
+            self.unk006 = r[7]
+            self.unk007 = r[8]
 
             # patch to SKI2
             self.boneid = -1
@@ -2291,10 +3270,8 @@ class fmtSM2_Bone:  # 36 Bytes or:32 bytes if in the SKIN file
 
         elif type == 0x534B4932:
             self.boneid = readShort(f, unsigned)
-            m = ([readHalf(f), readHalf(f), readHalf(f), readHalf(f)],
-                 [readHalf(f), readHalf(f), readHalf(f), readHalf(f)],
-                 [readHalf(f), readHalf(f), readHalf(f), readHalf(f)],
-                 [readHalf(f), readHalf(f), readHalf(f), readHalf(f)])
+            h = readHalfs(f, 16)
+            m = (h[0:4], h[4:8], h[8:12], h[12:16])
             self.matrix = matrix3(
                 [m[0][0] + m[0][3], m[0][1] + m[0][3], m[0][2] + m[0][3]],
                 [m[1][0] + m[1][3], m[1][1] + m[1][3], m[1][2] + m[1][3]],
@@ -2313,16 +3290,11 @@ class fmtSM2_Bone:  # 36 Bytes or:32 bytes if in the SKIN file
             self.name_len = len(self.name)
             for i in range(0, 4):
                 b = 0
-                if i < self.name_len: b = bit.CharAsInt(subString(self.name, i, 1))
+                if i < self.name_len: b = bit.CharAsInt(subString(self.name, i + 1, 1))
                 writeByte(s, b, unsigned)
 
-            for i in range(0, 3): writeFloat(s, self.position[i])
-            writeFloat(s, self.rotation[0])
-            writeFloat(s, self.rotation[1])
-            writeFloat(s, self.rotation[2])
-            writeFloat(s, self.rotation[3])
-            writeShort(s, self.unk006, unsigned)
-            writeShort(s, self.unk007, unsigned)
+            s.write_struct(fmtSM2_Bone.sm2_struct[s.little_endian],
+                           *(list(self.position[0:3]) + list(self.rotation[0:4]) + [self.unk006, self.unk007]))
 
         elif type == 0x534B4932:
             writeShort(s, self.boneid, unsigned)
@@ -2344,9 +3316,7 @@ class fmtSKEL_Hierarchy:  # 12 Bytes
     unk017 = 0
 
     def read(self, f=fopen()):
-        self.index = readLong(f, signed)
-        self.parent = readLong(f, signed)
-        self.unk017 = readLong(f, signed)
+        self.index, self.parent, self.unk017 = readLongs(f, 3, signed)
         return None
 
     def write(self, s=fopen()):
@@ -2384,34 +3354,49 @@ class fmtSKEL:  # 24 Bytes + n Bytes:bone info
     '''Hierarchy[n]'''
     parents = []
 
+    # boneid -> slot in names / parents, built by buildIndex
+    slots = None
+
+    # False if the file was damaged and only read leniently
+    clean = True
+
+    def buildIndex(self):
+        self.slots = {}
+        for i in range(len(self.parents) - 1, -1, -1):
+            self.slots[self.parents[i].index] = i  # first slot wins, as the old linear scan did
+        return self.slots
+
+    def slot(self, index=-1):
+        if self.slots == None: self.buildIndex()
+        return self.slots.get(index, -1)
+
     def name(self, index=-1):
         n = ""
         if index > -1:
-            for i in range(0, len(self.parents)):
-                if index == self.parents[i].index and i < len(self.names):
-                    n = self.names[i]
-                    break
+            i = self.slot(index)
+            if i > -1 and i < len(self.names): n = self.names[i]
         return n
 
     def parent(self, index=-1):
         par = -1
         if index > -1:
-            for i in self.parents:
-                if index == i.index:
-                    par = i.parent
-                    break
+            i = self.slot(index)
+            if i > -1: par = self.parents[i].parent
         return par
 
     def size(self):
         nsize = 32 + len(self.parents) * 12
         return nsize
 
+    def nbytes(self):
+        # rough memory held by the parsed skeleton, for the session cache
+        nsize = 512 + len(self.parents) * 200
+        for n in self.names: nsize += 64 + len(n)
+        return nsize
+
     def readFixedString(self, f=fopen(), len=0):
-        s, p = "", ftell(f) + len
-        for i in range(0, len):
-            b = readByte(f, unsigned)
-            if b == 0: break
-            s += bit.IntAsChar(b)
+        p = ftell(f) + len
+        s = bytes(f.view[f.pos:p if p < f.size else f.size]).split(b'\x00', 1)[0].decode('latin-1')
         fseek(f, p, seek_set)
         return s
 
@@ -2428,17 +3413,24 @@ class fmtSKEL:  # 24 Bytes + n Bytes:bone info
             self.names = []
             self.parents = []
             format("self.num_bones: \t%\n", (self.num_bones))
+            # every bone needs at least a name length and a hierarchy record
+            if not f.check_size(self.num_bones * 16 + 8, "SKEL bone table"):
+                format("Warning: \tBone count {%} overruns the file @ %\n", (self.num_bones, f.pos))
+                self.num_bones = max(0, (f.size - f.pos - 8) // 16)
             if self.num_bones > 0:
                 self.names = [str] * self.num_bones
                 self.parents = [fmtSKEL_Hierarchy] * self.num_bones
                 for i in range(0, self.num_bones):
-                    self.names[i] = self.readFixedString(f, readLong(f, unsigned))
+                    n = readLong(f, unsigned)
+                    if not f.check_size(n, "SKEL bone name"): n = max(0, f.size - f.pos)
+                    self.names[i] = self.readFixedString(f, n)
 
                 self.unk013 = readLong(f, unsigned)
                 self.unk014 = readLong(f, unsigned)
                 for i in range(0, self.num_bones):
                     self.parents[i] = fmtSKEL_Hierarchy()
                     self.parents[i].read(f)
+            self.buildIndex()
         else:
             format("Error: \tInvalid File Type {%}\n", (self.type))
         return None
@@ -2465,12 +3457,13 @@ class fmtSKEL:  # 24 Bytes + n Bytes:bone info
         for i in range(0, self.num_bones): self.parents[i].write(s)
         return None
 
-    def open(self, file=""):
+    def open(self, file="", strict=False):
         result = False
         if file != None and file != "":
-            f = fopen(file, "rb")
+            f = fopen(file, "rb", strict=strict)
             if f != None:
                 self.read(f)
+                self.clean = f.clean
                 fclose(f)
                 result = True
             else:
@@ -2497,10 +3490,29 @@ class fmtSM2_Skeleton:  # 4 Bytes + n bytes:Bone Data
     '''Bone[n]'''
     bones = []
 
+    # SKI2 bones decoded in one pass
+    '''uint16_t[n]'''
+    boneids = []
+
+    '''float[n][4][4]'''
+    matrices = []
+
     # for SKEL file
     '''fmtSKEL'''
     skel = fmtSKEL()
 
+    # boneid -> index in bones, built by buildIndex
+    boneIndex = {}
+
+    def buildIndex(self):
+        self.boneIndex = {}
+        for i in range(len(self.bones) - 1, -1, -1):
+            self.boneIndex[self.bones[i].boneid] = i
+        return self.boneIndex
+
+    def indexOf(self, boneid=-1):
+        return self.boneIndex.get(boneid, -1)
+
     def size(self, type=0):
         nsize = 4
         if type == 0x00534D32:
@@ -2512,14 +3524,61 @@ class fmtSM2_Skeleton:  # 4 Bytes + n bytes:Bone Data
     def read(self, f=fopen(), type=0):
         self.num_bones = readLong(f, unsigned)
         self.bones = []
+        self.boneids = []
+        self.matrices = []
         if self.num_bones > 0:
+            stride = 34 if type == 0x534B4932 else 36
+            if not f.check_size(self.num_bones * stride, "bone records"):
+                format("Warning: \tBone count {%} overruns the file @ %\n", (self.num_bones, f.pos))
+                self.num_bones = max(0, (f.size - f.pos) // stride)
+            f.allocate(self.num_bones * 512, "bones")
+            if np != None and type == 0x534B4932:
+                return self.readMatrices(f)
             self.bones = [fmtSM2_Bone] * self.num_bones
             for i in range(0, self.num_bones):
+                f.check_budget()
                 self.bones[i] = fmtSM2_Bone()
                 self.bones[i].read(f, type)
+        self.buildIndex()
         return None
 
-    def write(self, s=fopen()):
+    def readMatrices(self, f=fopen()):
+        # SKI2 bone records (uint16 id + 16 halves) decoded as one array
+        e = '<' if f.little_endian else '>'
+        dt = np.dtype([('boneid', e + 'u2'), ('matrix', e + 'u2', (4, 4))])
+        count = self.num_bones
+        if f.size > 0 and f.pos + count * dt.itemsize <= f.size:
+            rec = np.frombuffer(f.data, dtype=dt, count=count, offset=f.pos)
+            f.pos += count * dt.itemsize
+        else:
+            rec = np.zeros(count, dtype=dt)
+
+        with np.errstate(invalid='ignore', over='ignore'):  # inf / nan halves
+            m = halfToFloatArray(rec['matrix']).astype(np.float64)
+            mat = np.zeros((count, 4, 4), dtype=np.float64)
+            mat[:, 0:3, 0:3] = m[:, 0:3, 0:3] + m[:, 0:3, 3:4]
+            mat[:, 3, 0:3] = m[:, 3, 0:3] * m[:, 3, 3:4]
+            mat[:, 3, 3] = 1.0
+            quats = matrixToQuatArray(mat[:, 0:3, 0:3]).tolist()
+        self.matrices = mat.astype(np.float32)
+        self.boneids = rec['boneid'].astype(np.int32)
+
+        # thin bone records for the builder, same fields the per bone reader sets
+        rows = mat[:, :, 0:3].tolist()
+        ids = self.boneids.tolist()
+        self.bones = [fmtSM2_Bone] * count
+        for i in range(0, count):
+            b = fmtSM2_Bone()
+            b.boneid = ids[i]
+            b.matrix = matrix3(rows[i][0], rows[i][1], rows[i][2], rows[i][3])
+            b.name = "Bone " + str(b.boneid)
+            b.position = b.matrix.position()
+            b.rotation = quats[i]
+            self.bones[i] = b
+        self.buildIndex()
+        return None
+
+    def write(self, s=fopen(), type=0x00534D32):
         self.num_bones = len(self.bones)
         writeLong(s, self.num_bones, unsigned)
         for i in range(0, self.num_bones):
@@ -2532,20 +3591,45 @@ class fmtSM2_FaceBuf:  # 4 Bytes + n bytes:faces indices
     num_faces = 0,
 
     '''uint16_t[3]'''
-    faces = []
+    faces = []  # numpy uint16 (n, 3) when numpy is available
 
     def size(self):
         nsize = 4 + len(self.faces) * 3 * 2
         return nsize
 
-    def read(self, f=fopen()):
+    def read(self, f=fopen(), max_index=0, stopAddr=0):
+        # a zero count is the terminator, a count or index that can't be right is
+        # rejected without consuming anything so the caller can stop there
         result = False
+        addr = ftell(f)
         self.num_faces = readLong(f, unsigned)
         self.faces = []
         if self.num_faces > 0:
-            self.faces = [[int] * 3] * self.num_faces
-            for i in range(0, self.num_faces):
-                self.faces[i] = [readShort(f, unsigned), readShort(f, unsigned), readShort(f, unsigned)]
+            end = stopAddr if stopAddr > 0 and stopAddr < f.size else f.size
+            if self.num_faces * 6 > end - ftell(f):
+                if f.strict: f.fail("Face count %i overruns the buffer" % self.num_faces)
+                format("Warning: \tFace count {%} overruns the buffer @ %\n", (self.num_faces, addr))
+                f.clean = False
+                self.num_faces = 0
+                fseek(f, addr, seek_set)
+                return result
+            f.allocate(self.num_faces * 6, "faces")
+            if np != None:
+                # copied so the model doesn't keep the file's buffer (or mapping) alive
+                self.faces = readShortArray(f, self.num_faces * 3, unsigned).reshape(-1, 3).copy()
+            else:
+                self.faces = [[int] * 3] * self.num_faces
+                for i in range(0, self.num_faces):
+                    if i & 0xFFF == 0: f.check_budget()
+                    self.faces[i] = list(readShorts(f, 3, unsigned))
+            if max_index > 0 and faceMax(self.faces) >= max_index:
+                if f.strict: f.fail("Face index %i out of range (%i)" % (faceMax(self.faces), max_index))
+                format("Warning: \tFace index out of range {%} @ %\n", (faceMax(self.faces), addr))
+                f.clean = False
+                self.num_faces = 0
+                self.faces = []
+                fseek(f, addr, seek_set)
+                return result
             result = True
         return result
 
@@ -2553,9 +3637,13 @@ class fmtSM2_FaceBuf:  # 4 Bytes + n bytes:faces indices
         result = False
         self.num_faces = len(self.faces)
         writeLong(s, self.num_faces, unsigned)
-        for i in range(0, self.num_faces):
-            for v in range(0, 3): writeShort(s, self.faces[i][v], unsigned)
-            result = True
+        if np != None and isinstance(self.faces, np.ndarray):
+            writeBuffer(s, self.faces.astype(('<' if s.little_endian else '>') + 'u2').tobytes())
+            result = self.num_faces > 0
+        else:
+            for i in range(0, self.num_faces):
+                for v in range(0, 3): writeShort(s, self.faces[i][v], unsigned)
+                result = True
         return result
 
 
@@ -2584,6 +3672,9 @@ class fmtSM2_Object:
     '''FaceBuf[n]'''
     faceBuf = []  # no count? read until end is reached
 
+    # file offset of each face buffer found by read
+    faceAddrs = []
+
     '''uint32_t'''
     unk005 = 0  # ?? padding ??? insufficient samples to determine
     '''
@@ -2597,7 +3688,7 @@ class fmtSM2_Object:
     padding = 0
 
     def size(self):
-        nsize = 46 + self.padding + len(self.name)
+        nsize = 44 + self.padding + len(self.name)  # name_len, name + null, 31 bytes of header, 0 terminator, unk005
         for i in range(0, len(self.faceBuf)):
             nsize += self.faceBuf[i].size()
         return nsize
@@ -2607,38 +3698,39 @@ class fmtSM2_Object:
             this is a hack to skip and 0's or padding after the face buffer
         '''
         p = ftell(f)
-        for i in range(0, len):
-            b = readByte(f, unsigned)
-            if b > 0 or b == None:
-                fseek(f, -1, seek_cur)
-                break
+        fseek(f, f.find_nonzero(p, p + len), seek_set)
         # return number of bytes skipped
         return (ftell(f) - p)
 
     def read(self, f=fopen(), stopAddr=0):
         self.name_len = readLong(f, unsigned)
-        self.name = ""
-        for i in range(0, self.name_len):
-            b = readByte(f, unsigned)
-            if b > 0: self.name += bit.IntAsChar(b)
+        f.check_size(self.name_len, "object name")
+        end = ftell(f) + self.name_len
+        if end > f.size: end = f.size
+        self.name = bytes(f.view[ftell(f):end]).replace(b'\x00', b'').decode('latin-1')
+        fseek(f, end, seek_set)
 
         self.unk003 = readShort(f, unsigned)
         self.max_index = readLong(f, unsigned)
         self.unk004 = readByte(f, unsigned)
-        self.bb_max = [readFloat(f), readFloat(f), readFloat(f)]
-        self.bb_min = [readFloat(f), readFloat(f), readFloat(f)]
+        self.bb_max = list(readFloats(f, 3))
+        self.bb_min = list(readFloats(f, 3))
         self.faceBuf = []
+        self.faceAddrs = []
         fb = fmtSM2_FaceBuf()
         while ftell(f) < stopAddr:
+            f.check_budget()
+            addr = ftell(f)
             fb = fmtSM2_FaceBuf()
-            if not fb.read(f): break
+            if not fb.read(f, self.max_index, stopAddr): break
             append(self.faceBuf, fb)
+            append(self.faceAddrs, addr)
 
         self.unk005 = readLong(f, unsigned)
 
         # Unsure how the padding in this area works, skip until a none 0 is reached
-        padding = self.seekPastWhiteSpace(f)
-        format("padding: \t%:@ %\n", (padding, ftell(f)))
+        self.padding = self.seekPastWhiteSpace(f)
+        format("padding: \t%:@ %\n", (self.padding, ftell(f)))
         return None
 
     def write(self, s=fopen()):
@@ -2648,8 +3740,8 @@ class fmtSM2_Object:
         writeShort(s, self.unk003, unsigned)
         writeLong(s, self.max_index, unsigned)
         writeByte(s, self.unk004, unsigned)
-        for i in range(0, 3): writeFloat(s, self.bb_max[i])
-        for i in range(0, 3): writeFloat(s, self.bb_min[i])
+        writeFloats(s, self.bb_max[0:3])
+        writeFloats(s, self.bb_min[0:3])
         for i in range(0, len(self.faceBuf)): self.faceBuf[i].write(s)
         writeLong(s, 0, unsigned)
         writeLong(s, self.unk005, unsigned)
@@ -2657,6 +3749,39 @@ class fmtSM2_Object:
         return None
 
 
+# the packed uint8 normals and tangents decode as (byte - normalBias) / normalBias for
+# the axes picked by normalOrder, times normalSign, then normalized. On the samples the
+# normals match the face normals this way, the tangents and the 4th bytes are guesses
+normalOrder = (0, 1, 2)
+normalSign = (1.0, 1.0, 1.0)
+normalBias = 127.5
+
+
+def decodeNormals(packed=[], normalize=True):
+    # uint8[n][4] to float[n][3] with normalOrder / normalSign / normalBias
+    if np != None:
+        n = np.asarray(packed, dtype=np.float32).reshape(-1, 4)[:, normalOrder]
+        n = (n - normalBias) * (np.array(normalSign, dtype=np.float32) / normalBias)
+        if normalize:
+            l = np.sqrt((n * n).sum(axis=1, keepdims=True))
+            n = np.divide(n, l, out=np.zeros_like(n), where=l > 0)
+        return n
+    result = []
+    for b in packed:
+        n = [(b[normalOrder[i]] - normalBias) * normalSign[i] / normalBias for i in range(0, 3)]
+        l = math.sqrt(n[0] * n[0] + n[1] * n[1] + n[2] * n[2])
+        if normalize: n = [c / l for c in n] if l > 0 else [0.0, 0.0, 0.0]
+        append(result, n)
+    return result
+
+
+def decodeNormalW(packed=[]):
+    # the 4th byte with the same bias, a guess at the tangent handedness
+    if np != None:
+        return (np.asarray(packed, dtype=np.float32).reshape(-1, 4)[:, 3] - normalBias) / normalBias
+    return [(b[3] - normalBias) / normalBias for b in packed]
+
+
 class fmtSM2_Vertex:  # 20 Bytes
     '''
         I'm unable to decode the normals and what could be also be bi-normals
@@ -2682,37 +3807,142 @@ class fmtSM2_Vertex:  # 20 Bytes
     binormal = [0.0, 0.0, 0.0, 0.0]
 
     def read(self, f=fopen(), type=0):
-        self.position = [readHalf(f), readHalf(f), readHalf(f)]
-        w = readHalf(f)
-        self.position = [self.position[0] + w, self.position[1] + w, self.position[2] + w]
-        self.texcorrd = [readHalf(f), readHalf(f), 0.0]
+        h = readHalfs(f, 6)
+        w = h[3]
+        self.position = [h[0] + w, h[1] + w, h[2] + w]
+        self.texcorrd = [h[4], h[5], 0.0]
         if type == 0x00534D32:  # 'SM2' 20 Bytes
-            self.normal = [readByte(f, unsigned), readByte(f, unsigned), readByte(f, unsigned),
-                           readByte(f, unsigned)]  # normal?
-            self.binormal = [readByte(f, unsigned), readByte(f, unsigned), readByte(f, unsigned),
-                             readByte(f, unsigned)]  # tangent?
+            b = readBytes(f, 8, unsigned)
+            self.normal = list(b[0:4])  # normal, see decodeNormals
+            self.binormal = list(b[4:8])  # tangent?
         elif type == 0x534B4932:  # 'SKI2' 32 Bytes
-            self.weight = [readHalf(f), readHalf(f), readHalf(f), readHalf(f)]  # weight
-            self.normal = [readByte(f, unsigned), readByte(f, unsigned), readByte(f, unsigned),
-                           readByte(f, unsigned)]  # normal?
-            self.boneid = [readByte(f, unsigned), readByte(f, unsigned), readByte(f, unsigned),
-                           readByte(f, unsigned)]  # boneid
-            self.binormal = [readByte(f, unsigned), readByte(f, unsigned), readByte(f, unsigned),
-                             readByte(f, unsigned)]  # tangent?
+            self.weight = list(readHalfs(f, 4))  # weight
+            b = readBytes(f, 12, unsigned)
+            self.normal = list(b[0:4])  # normal, see decodeNormals
+            self.boneid = list(b[4:8])  # boneid
+            self.binormal = list(b[8:12])  # tangent?
             # round off the weights, theres some issues with the half float function
             for i in range(0, len(self.weight)): self.weight[i] = float(int(self.weight[i] * 1000)) / 1000.0
         return None
 
     def write(self, s=fopen()):
+        # 'SM2' 20 Bytes, the fourth half is added to the position on read so it's left 0
         for i in range(0, 3): writeHalf(s, self.position[i])
-        self.texcorrd = [self.texcorrd[1], self.texcorrd[1], 0.0]
+        writeHalf(s, 0.0)
         for i in range(0, 2): writeHalf(s, self.texcorrd[i])
-        #for i in range(0, 4): writeShort(s, self.unk009[i], unsigned)
+        for i in range(0, 4): writeByte(s, int(self.normal[i]), unsigned)
+        for i in range(0, 4): writeByte(s, int(self.binormal[i]), unsigned)
         return None
 
 
-class fmtSM2:  # 60 Bytes + n Bytes:Buffers
-    '''uint32_t'''
+class fmtSM2_VertexBuffer:
+    '''
+        The whole vertex block decoded in one pass into a struct of arrays,
+        indexing it returns a fmtSM2_Vertex so sm.verts[i].position still works.
+    '''
+
+    # record layouts, half floats are read as uint16 then converted
+    layouts = {
+        0x00534D32: [  # 'SM2' 20 Bytes
+            ('position', 'u2', (4,)), ('texcorrd', 'u2', (2,)),
+            ('normal', 'u1', (4,)), ('binormal', 'u1', (4,))
+        ],
+        0x534B4932: [  # 'SKI2' 32 Bytes
+            ('position', 'u2', (4,)), ('texcorrd', 'u2', (2,)), ('weight', 'u2', (4,)),
+            ('normal', 'u1', (4,)), ('boneid', 'u1', (4,)), ('binormal', 'u1', (4,))
+        ]
+    }
+
+    '''float[n][3]'''
+    position = []
+
+    '''float[n][2]'''
+    texcorrd = []
+
+    '''float[n][4]'''
+    weight = []
+
+    '''uint8_t[n][4]'''
+    normal = []
+
+    '''uint8_t[n][4]'''
+    boneid = []
+
+    '''uint8_t[n][4]'''
+    binormal = []
+
+    def __len__(self):
+        return len(self.position)
+
+    def __getitem__(self, index):
+        v = fmtSM2_Vertex()
+        v.position = toList(self.position[index])
+        v.texcorrd = toList(self.texcorrd[index]) + [0.0]
+        v.weight = toList(self.weight[index])
+        v.normal = toList(self.normal[index])
+        v.boneid = toList(self.boneid[index])
+        v.binormal = toList(self.binormal[index])
+        return v
+
+    def dtype(self, type=0, isLittle=True):
+        e = '<' if isLittle else '>'
+        return np.dtype([(n, e + t, shape) for n, t, shape in fmtSM2_VertexBuffer.layouts[type]])
+
+    def read(self, f=fopen(), type=0, count=0):
+        if np == None or type not in fmtSM2_VertexBuffer.layouts:
+            return self.readVerts(f, type, count)
+        dt = self.dtype(type, f.little_endian)
+        if count < 0: count = 0
+        if not f.check_size(count * dt.itemsize, "vertex buffer"): count = max(0, (f.size - f.pos) // dt.itemsize)
+        f.allocate(count * 64, "vertices")
+        rec = np.zeros(0, dtype=dt)
+        if count > 0:
+            rec = np.frombuffer(f.data, dtype=dt, count=count, offset=f.pos)
+            f.pos += count * dt.itemsize
+
+        with np.errstate(invalid='ignore', over='ignore'):  # inf / nan halves
+            pos = halfToFloatArray(rec['position'])
+            self.position = pos[:, 0:3] + pos[:, 3:4]
+            self.texcorrd = halfToFloatArray(rec['texcorrd'])
+            if type == 0x534B4932:
+                # round off the weights, theres some issues with the half float function
+                w = halfToFloatArray(rec['weight']).astype(np.float64)
+                self.weight = (np.trunc(w * 1000.0) / 1000.0).astype(np.float32)
+        # copied, views of rec would keep the file's buffer (or mapping) alive
+        self.normal = np.array(rec['normal'])
+        self.binormal = np.array(rec['binormal'])
+        if type == 0x534B4932:
+            self.boneid = np.array(rec['boneid'])
+        else:
+            self.weight = np.broadcast_to(np.array(fmtSM2_Vertex.weight, dtype=np.float32), (count, 4))
+            self.boneid = np.broadcast_to(np.array(fmtSM2_Vertex.boneid, dtype=np.int16), (count, 4))
+        return None
+
+    def readVerts(self, f=fopen(), type=0, count=0):
+        # per vertex fallback when numpy isn't available
+        stride = 32 if type == 0x534B4932 else 20
+        if not f.check_size(count * stride, "vertex buffer"): count = max(0, (f.size - f.pos) // stride)
+        f.allocate(count * 512, "vertices")
+        verts = [fmtSM2_Vertex] * count
+        for i in range(0, count):
+            if i & 0xFFF == 0: f.check_budget()
+            verts[i] = fmtSM2_Vertex()
+            verts[i].read(f, type)
+        self.position = [v.position for v in verts]
+        self.texcorrd = [v.texcorrd[0:2] for v in verts]
+        self.weight = [v.weight for v in verts]
+        self.normal = [v.normal for v in verts]
+        self.boneid = [v.boneid for v in verts]
+        self.binormal = [v.binormal for v in verts]
+        return None
+
+
+# vertices weighted between yields in fmtSM2.buildSteps
+buildSlice = 4096
+
+
+class fmtSM2:  # 60 Bytes + n Bytes:Buffers
+    '''uint32_t'''
     type = 0x00534D32  # SM2, SKI2
 
     '''uint32_t'''
@@ -2746,7 +3976,7 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
     bones_addr = 0
 
     '''Vertex'''
-    verts = []
+    verts = fmtSM2_VertexBuffer()
 
     '''Object'''
     meshs = fmtSM2_Object()
@@ -2754,6 +3984,10 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
     '''Skeleton'''
     bones = fmtSM2_Skeleton()
 
+    # False if the file (or its skel) was damaged and only read leniently,
+    # strict reads don't take these from the caches
+    clean = True
+
     def size(self, type=0):
         nsize = 52
         if self.type == 0x00534D32:
@@ -2762,7 +3996,9 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
             nsize += 8 + len(self.verts) * 32 + self.meshs.size() + self.bones.size(self.type)
         return nsize
 
-    def read(self, f=fopen(), skelfile=""):
+    def readHeader(self, f=fopen()):
+        # reads only the header, for SKI2 the object address is derived from the
+        # vertex count and the bone address is not known until the objects are read
         fsize = f.size
         result = False
         if fsize > 52:
@@ -2773,49 +4009,19 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
                     self.num_verts = readLong(f, unsigned)
 
                 elif self.type == 0x534B4932:
-                    self.num_verts = readShort(f, unsigned)
-                    self.verts_addr = readShort(f, unsigned)
+                    self.num_verts, self.verts_addr = readShorts(f, 2, unsigned)
 
-                self.bb_min = [readFloat(f), readFloat(f), readFloat(f)]
-                self.bb_max = [readFloat(f), readFloat(f), readFloat(f)]
-                self.draw_dist = readFloat(f)
+                r = readFloats(f, 7)
+                self.bb_min = list(r[0:3])
+                self.bb_max = list(r[3:6])
+                self.draw_dist = r[6]
                 if self.type == 0x00534D32:
-                    self.unk001 = readLong(f, unsigned)
-                    self.unk002 = readLong(f, unsigned)
-                    self.verts_addr = readLong(f, unsigned)
-
-                self.meshs_addr = readLong(f, unsigned)
-                self.bones_addr = readLong(f, unsigned)
-
-                self.verts = []
-                if self.verts_addr > 0 and self.num_verts > 0:
-                    self.verts = [fmtSM2_Vertex] * self.num_verts
-                    fseek(f, self.verts_addr, seek_set)
-                    for i in range(0, self.num_verts):
-                        self.verts[i] = fmtSM2_Vertex()
-                        self.verts[i].read(f, self.type)
-
-                if self.type == 0x534B4932: self.meshs_addr = ftell(f)
-
-                self.meshs = []
-                if self.meshs_addr > 0 and self.meshs_addr < fsize:
-                    fseek(f, self.meshs_addr, seek_set)
-                    self.meshs = fmtSM2_Object()
-                    self.meshs.read(f, fsize)
-
-                if self.type == 0x534B4932: self.bones_addr = ftell(f)
-
-                self.bones = []
-                if self.bones_addr > 0 and self.bones_addr < fsize:
-                    fseek(f, self.bones_addr, seek_set)
-                    self.bones = fmtSM2_Skeleton()
-                    self.bones.read(f, self.type)
-
-                    if self.type == 0x534B4932 and skelfile != None and skelfile != "" and doesFileExist(
-                            skelfile) == True:
-                        if not self.bones.skel.open(skelfile):
-                            format("Warning: \tFailed to locate SKEL file\n")
+                    self.unk001, self.unk002, self.verts_addr = readLongs(f, 3, unsigned)
 
+                self.meshs_addr, self.bones_addr = readLongs(f, 2, unsigned)
+                if self.type == 0x534B4932:
+                    self.meshs_addr = self.verts_addr + self.num_verts * 32
+                    self.bones_addr = 0
                 result = True
             else:
                 format("Error: \tUnsupported File Type:0x\n", (self.type))
@@ -2823,32 +4029,223 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
             format("Error: \tInvalid File Size {%}\n", (fsize))
         return result
 
+    def read(self, f=fopen(), skelfile=""):
+        fsize = f.size
+        result = False
+        if self.readHeader(f):
+            self.verts = fmtSM2_VertexBuffer()
+            if self.verts_addr > 0 and self.num_verts > 0:
+                fseek(f, self.verts_addr, seek_set)
+                self.verts.read(f, self.type, self.num_verts)
+            f.check_budget()
+
+            if self.type == 0x534B4932: self.meshs_addr = ftell(f)
+
+            self.meshs = []
+            if self.meshs_addr > 0 and self.meshs_addr < fsize:
+                fseek(f, self.meshs_addr, seek_set)
+                self.meshs = fmtSM2_Object()
+                self.meshs.read(f, fsize)
+            f.check_budget()
+
+            if self.type == 0x534B4932: self.bones_addr = ftell(f)
+
+            self.bones = []
+            if self.bones_addr > 0 and self.bones_addr < fsize:
+                fseek(f, self.bones_addr, seek_set)
+                self.bones = fmtSM2_Skeleton()
+                self.bones.read(f, self.type)
+
+                if self.type == 0x534B4932 and skelfile != None and skelfile != "" and doesFileExist(
+                        skelfile) == True:
+                    skel = openSkel(skelfile, f.strict)
+                    if skel != None:
+                        self.bones.skel = skel
+                        if not skel.clean: f.clean = False
+                    else:
+                        format("Warning: \tFailed to locate SKEL file\n")
+
+            result = True
+        self.clean = f.clean
+        return result
+
     def write(self, s=fopen()):
         ptr = 60  # Vertex Buffer Position, Always 60
-        self.num_self.verts = len(self.verts)
+        self.num_verts = len(self.verts)
         writeLong(s, 0x00534D32, unsigned)  # 'SM2'
         writeLong(s, self.version, unsigned)
-        writeLong(s, self.num_self.verts, unsigned)
-        for i in range(0, 3): writeFloat(s, self.bb_min[i])
-        for i in range(0, 3): writeFloat(s, self.bb_max[i])
-        writeFloat(s, self.draw_dist)
+        writeLong(s, self.num_verts, unsigned)
+        writeFloats(s, self.bb_min[0:3] + self.bb_max[0:3] + [self.draw_dist])
         writeLong(s, self.unk001, unsigned)
         writeLong(s, self.unk002, unsigned)
         writeLong(s, ptr, unsigned)  # Vertices Address
-        ptr += self.num_self.verts * 20
+        ptr += self.num_verts * 20
         writeLong(s, ptr, unsigned)  # Objects Address
         ptr += self.meshs.size()
         writeLong(s, ptr, unsigned)  # Bones Address
-        for i in range(0, self.num_self.verts): self.verts[i].write(s)
+        for i in range(0, self.num_verts): self.verts[i].write(s)
         self.meshs.write(s)
         self.bones.write(s)
         return None
 
-    def build(self, texName="", mscale=0.00254, clear_scene=False, impSkin=True, skelName = "Skeleton", rotOff=(matrix3([-1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]))):
+    def nbytes(self):
+        # rough memory held by the parsed model, for the session cache
+        nsize = 1024
+        for k in ('position', 'texcorrd', 'weight', 'normal', 'boneid', 'binormal'):
+            v = getattr(self.verts, k)
+            if np != None and isinstance(v, np.ndarray):
+                nsize += v.nbytes
+            else:
+                nsize += len(v) * 120
+        if isinstance(self.meshs, fmtSM2_Object):
+            for fb in self.meshs.faceBuf:
+                nsize += fb.faces.nbytes if np != None and isinstance(fb.faces, np.ndarray) else len(fb.faces) * 120
+        if isinstance(self.bones, fmtSM2_Skeleton):
+            nsize += len(self.bones.bones) * 1024
+        return nsize
+
+    def toArrays(self):
+        '''
+            the decoded model as a dict of numpy arrays, for the disk cache
+            fromArrays restores everything build() needs from it
+        '''
+        meshs = self.meshs if isinstance(self.meshs, fmtSM2_Object) else fmtSM2_Object()
+        bones = self.bones if isinstance(self.bones, fmtSM2_Skeleton) else fmtSM2_Skeleton()
+        skel = bones.skel
+        a = {}
+        a['header'] = np.array([self.type, self.version, self.num_verts, self.unk001, self.unk002,
+                                self.verts_addr, self.meshs_addr, self.bones_addr], dtype=np.int64)
+        a['bounds'] = np.array(list(self.bb_min[0:3]) + list(self.bb_max[0:3]) + [self.draw_dist], dtype=np.float64)
+
+        for k in ('position', 'texcorrd', 'weight', 'normal', 'boneid', 'binormal'):
+            a['verts_' + k] = np.asarray(getattr(self.verts, k))
+
+        a['object'] = np.array([meshs.name_len, meshs.unk003, meshs.max_index, meshs.unk004,
+                                meshs.unk005, meshs.padding], dtype=np.int64)
+        a['object_bounds'] = np.array(list(meshs.bb_max[0:3]) + list(meshs.bb_min[0:3]), dtype=np.float64)
+        a['object_name'] = np.array(meshs.name)
+        faces = [np.asarray(fb.faces, dtype=np.uint16).reshape(-1, 3) for fb in meshs.faceBuf]
+        a['face_counts'] = np.array([len(x) for x in faces], dtype=np.int64)
+        a['faces'] = np.concatenate(faces) if len(faces) > 0 else np.zeros((0, 3), dtype=np.uint16)
+
+        b = bones.bones
+        a['bone_ids'] = np.array([x.boneid for x in b], dtype=np.int64)
+        a['bone_names'] = np.array([x.name for x in b], dtype=str)
+        a['bone_unk'] = np.array([[x.unk006, x.unk007] for x in b], dtype=np.int64).reshape(-1, 2)
+        a['bone_positions'] = np.array([list(x.position[0:3]) for x in b], dtype=np.float64).reshape(-1, 3)
+        a['bone_rotations'] = np.array([list(x.rotation[0:4]) for x in b], dtype=np.float64).reshape(-1, 4)
+        a['bone_matrices'] = np.array(
+            [[x.matrix.row1[0:3], x.matrix.row2[0:3], x.matrix.row3[0:3], x.matrix.row4[0:3]] for x in b],
+            dtype=np.float64).reshape(-1, 4, 3)
+        a['skeleton_matrices'] = np.asarray(bones.matrices, dtype=np.float32).reshape(-1, 4, 4)
+
+        a['skel_type'] = np.array(skel.type)
+        a['skel_header'] = np.array([skel.unk010, skel.unk011, skel.unk013, skel.unk014], dtype=np.int64)
+        a['skel_scale'] = np.array([skel.unk012], dtype=np.float64)
+        a['skel_names'] = np.array(skel.names, dtype=str)
+        a['skel_parents'] = np.array([[x.index, x.parent, x.unk017] for x in skel.parents], dtype=np.int64).reshape(-1, 3)
+        a['clean'] = np.array([self.clean])
+        return a
+
+    def fromArrays(self, a={}):
+        # restores a model saved with toArrays, no file is read
+        h = a['header'].tolist()
+        self.type, self.version, self.num_verts, self.unk001, self.unk002 = h[0:5]
+        self.verts_addr, self.meshs_addr, self.bones_addr = h[5:8]
+        r = a['bounds'].tolist()
+        self.bb_min = r[0:3]
+        self.bb_max = r[3:6]
+        self.draw_dist = r[6]
+
+        self.verts = fmtSM2_VertexBuffer()
+        for k in ('position', 'texcorrd', 'weight', 'normal', 'boneid', 'binormal'):
+            setattr(self.verts, k, a['verts_' + k])
+
+        self.meshs = fmtSM2_Object()
+        o = a['object'].tolist()
+        self.meshs.name_len, self.meshs.unk003, self.meshs.max_index, self.meshs.unk004 = o[0:4]
+        self.meshs.unk005, self.meshs.padding = o[4:6]
+        r = a['object_bounds'].tolist()
+        self.meshs.bb_max = r[0:3]
+        self.meshs.bb_min = r[3:6]
+        self.meshs.name = str(a['object_name'])
+        self.meshs.faceBuf = []
+        self.meshs.faceAddrs = []
+        p = 0
+        for n in a['face_counts'].tolist():
+            fb = fmtSM2_FaceBuf()
+            fb.num_faces = n
+            fb.faces = a['faces'][p:p + n]
+            append(self.meshs.faceBuf, fb)
+            p += n
+
+        self.bones = fmtSM2_Skeleton()
+        ids = a['bone_ids'].tolist()
+        names = a['bone_names'].tolist()
+        unk = a['bone_unk'].tolist()
+        pos = a['bone_positions'].tolist()
+        rot = a['bone_rotations'].tolist()
+        mat = a['bone_matrices'].tolist()
+        self.bones.num_bones = len(ids)
+        self.bones.bones = [fmtSM2_Bone] * len(ids)
+        for i in range(0, len(ids)):
+            b = fmtSM2_Bone()
+            b.boneid = ids[i]
+            b.name = names[i]
+            b.unk006, b.unk007 = unk[i]
+            b.position = pos[i]
+            b.rotation = rot[i]
+            b.matrix = matrix3(mat[i][0], mat[i][1], mat[i][2], mat[i][3])
+            self.bones.bones[i] = b
+        self.bones.matrices = a['skeleton_matrices']
+        self.bones.boneids = a['bone_ids'].astype(np.uint16) if len(self.bones.matrices) > 0 else []
+        self.bones.buildIndex()
+
+        skel = fmtSKEL()
+        skel.type = str(a['skel_type'])
+        skel.unk010, skel.unk011, skel.unk013, skel.unk014 = a['skel_header'].tolist()
+        skel.unk012 = a['skel_scale'].tolist()[0]
+        skel.names = a['skel_names'].tolist()
+        skel.num_bones = len(skel.names)
+        skel.parents = [fmtSKEL_Hierarchy] * len(a['skel_parents'])
+        for i, r in enumerate(a['skel_parents'].tolist()):
+            skel.parents[i] = fmtSKEL_Hierarchy()
+            skel.parents[i].index, skel.parents[i].parent, skel.parents[i].unk017 = r
+        skel.buildIndex()
+        self.bones.skel = skel
+        # entries from before the flag was stored count as damaged
+        self.clean = bool(a['clean'][0]) if 'clean' in a else False
+        return True
+
+    def build(self, texName="", mscale=0.00254, clear_scene=False, impSkin=True, skelName = "Skeleton", rotOff=(matrix3([-1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1])), dispColour="loop", impNormals=True):
+        for progress in self.buildSteps(texName, mscale, clear_scene, impSkin, skelName, rotOff, dispColour, impNormals): pass
+        return None
+
+    def buildSteps(self, texName="", mscale=0.00254, clear_scene=False, impSkin=True, skelName = "Skeleton", rotOff=(matrix3([-1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1])), dispColour="loop", impNormals=True):
+        '''
+            build() a piece at a time, yields the fraction built so far after the
+            skeleton, each mesh and every buildSlice vertices weighted
+            closing the generator early deletes the objects it created
+        '''
+        existing = set(o.as_pointer() for o in bpy.data.objects)
+        try:
+            for progress in self.buildParts(texName, mscale, clear_scene, impSkin, skelName, rotOff, dispColour, impNormals): yield progress
+        except GeneratorExit:
+            # cancelled, don't leave a half built model in the scene
+            for o in [o for o in bpy.data.objects if not o.as_pointer() in existing]:
+                bpy.data.objects.remove(o, do_unlink=True)
+            raise
+
+    def buildParts(self, texName="", mscale=0.00254, clear_scene=False, impSkin=True, skelName = "Skeleton", rotOff=(matrix3([-1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1])), dispColour="loop", impNormals=True):
 
         # ClearScene
         if clear_scene == True: deleteScene(['MESH', 'ARMATURE'])
 
+        # work done so far out of the skeleton, each mesh and each vertex weighted
+        skinning = impSkin==True and len(self.bones.bones) > 0
+        work = 1 + len(self.meshs.faceBuf) * (1 + (len(self.verts) if skinning else 0))
+        done = 0
+
         # Build Skeleton
         boneNames = []
         boneArray = boneSys(skelName)
@@ -2886,35 +4283,49 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
         
         boneArray.editMode(True)
         # -------------------------- B O N E  E D I T  M O D E  O P E N E D -------------------------- #
+        self.bones.buildIndex()
         for i in range(0, len(self.bones.bones)):
             p = self.bones.skel.parent(self.bones.bones[i].boneid)
             if p > -1:
-                for j in range(0, len(self.bones.bones)):
-                    if self.bones.bones[j].boneid == p:
-                        boneArray.setParent(boneNames[i], boneNames[j])
-                        break
+                j = self.bones.indexOf(p)
+                if j > -1: boneArray.setParent(boneNames[i], boneNames[j])
         
         boneArray.rebuildEndPositions(mscale=mscale)
         
         # -------------------------- B O N E  E D I T  M O D E  C L O S E D -------------------------- #
         boneArray.editMode(False)
+        done += 1
+        yield done / work
 
 
         # Build Meshes
         vertArray = []
         tvertArray = []
+        normArray = []
+        attributes = {}
         
         if len(self.verts) > 0:
-            vertArray = [[float] * 3] * self.num_verts
-            tvertArray = [[float] * 3] * self.num_verts
-
-            for i in range(0, len(self.verts)):
-                vertArray[i] = [self.verts[i].position[0] * mscale, self.verts[i].position[2] * mscale,
-                                self.verts[i].position[1] * mscale]
-                tvertArray[i] = [self.verts[i].texcorrd[0], self.verts[i].texcorrd[1], 0.0]
+            if np != None and isinstance(self.verts.position, np.ndarray):
+                vertArray = self.verts.position[:, (0, 2, 1)] * mscale
+                tvertArray = self.verts.texcorrd
+            else:
+                vertArray = [[p[0] * mscale, p[2] * mscale, p[1] * mscale] for p in self.verts.position]
+                tvertArray = self.verts.texcorrd
+
+        if impNormals and len(self.verts) > 0:
+            # same axis swap as the positions, the decoded values are kept for export
+            if np != None:
+                normArray = decodeNormals(self.verts.normal)[:, (0, 2, 1)]
+                tangents = decodeNormals(self.verts.binormal)[:, (0, 2, 1)]
+            else:
+                normArray = [[n[0], n[2], n[1]] for n in decodeNormals(self.verts.normal)]
+                tangents = [[n[0], n[2], n[1]] for n in decodeNormals(self.verts.binormal)]
+            attributes = {"sm_normal": normArray, "sm_tangent": tangents, "sm_tangent_w": decodeNormalW(self.verts.binormal)}
 
         for i in range(0, len(self.meshs.faceBuf)):  # these appear to be Level of Details meshes
-            if len(self.meshs.faceBuf[i].faces) == 0: continue
+            if len(self.meshs.faceBuf[i].faces) == 0:
+                done += 1 + (len(self.verts) if skinning else 0)
+                continue
             
             mshName = "Mesh " + str(i)
             if self.meshs.name != "": mshName = self.meshs.name + " (" + str(i) + ")"
@@ -2929,14 +4340,19 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
                 tverts=[tvertArray],
                 faces=self.meshs.faceBuf[i].faces,
                 obj_name=mshName,
-                materials=[mat]
+                materials=[mat],
+                dispColour=dispColour,
+                normals=normArray,
+                attributes=attributes
                 )
             
             if i > 0: hide(msh)
+            done += 1
+            yield done / work
             
             
             # Import Weights
-            if impSkin==True and len(self.bones.bones) > 0:
+            if skinning:
 
                 weights = []
                 boneids = []
@@ -2980,23 +4396,593 @@ class fmtSM2:  # 60 Bytes + n Bytes:Buffers
                 # apply weights to skin modifier
                 bi = []
                 we = []
+                vertWeights = toList(self.verts.weight)
+                vertBoneids = toList(self.verts.boneid)
                 for vi in range(0, len(self.verts)):
                     bi = []
                     we = []
-                    for fi in range(0, len(self.verts[vi].weight)):
-                        if self.verts[vi].weight[fi] > 0.0:
-                            x = findItem(boneMap, self.verts[vi].boneid[fi])
+                    for fi in range(0, len(vertWeights[vi])):
+                        if vertWeights[vi][fi] > 0.0:
+                            x = findItem(boneMap, vertBoneids[vi][fi])
                             if x > 0:
                                 append(bi, x)
-                                append(we, self.verts[vi].weight[fi])
+                                append(we, vertWeights[vi][fi])
                     if len(we) == 0:
                         we = [1.0]
                         bi = [0]
                     skinMod.ReplaceVertexWeights(vi, bi, we)
+                    if (vi + 1) % buildSlice == 0:
+                        done += buildSlice
+                        yield done / work
+                done += len(self.verts) % buildSlice
+                yield done / work
+
+
+# ====================================================================================
+# Decoded model cache
+# ====================================================================================
+# models are stored as .npz files named by the sha1 of the model and skel bytes, so
+# an edited file or a new parser version never hits a stale entry
+
+# bump when a change to the parser changes what it decodes
+parserVersion = 1
+
+# read() checks the disk cache before parsing
+useDiskCache = True
+
+# folder for the cache, "" puts it in the system temp folder
+cacheDir = ""
+
+# the least recently used entries are deleted past this size
+cacheLimit = 512 * 1024 * 1024
+
+
+def cachePath(key=""):
+    folder = cacheDir if cacheDir != "" else os.path.join(tempfile.gettempdir(), "bpy_god_summoner_cache")
+    if key == "": return folder
+    return os.path.join(folder, key + ".npz")
+
+
+def cacheKey(files=[]):
+    # sha1 of the files' bytes and everything else that changes the decoded result
+    h = hashlib.sha1(("sm2 %i %i" % (parserVersion, legacyHalfFloats)).encode())
+    for file in files:
+        h.update(b'\x00')
+        if file != None and file != "" and os.path.isfile(file):
+            with open(file, 'rb') as s:
+                for chunk in iter(lambda: s.read(1024 * 1024), b''): h.update(chunk)
+    return h.hexdigest()
+
+
+def cacheLoad(key=""):
+    '''
+        returns the fmtSM2 stored under key, or None
+        a hit refreshes the entry's mtime, which is what the eviction orders by
+    '''
+    path = cachePath(key)
+    if np == None or not os.path.isfile(path): return None
+    sm = None
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            a = {k: z[k] for k in z.files}
+        sm = fmtSM2()
+        sm.fromArrays(a)
+        os.utime(path)
+    except Exception as err:
+        format("Warning: \tDiscarding bad cache entry {%}, %\n", (path, err))
+        sm = None
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return sm
+
+
+def cacheStore(key="", sm=fmtSM2()):
+    # saves sm under key, then trims the cache back to cacheLimit
+    if np == None: return False
+    path = cachePath(key)
+    tmp = path + ".%i.tmp" % os.getpid()
+    try:
+        os.makedirs(cachePath(), exist_ok=True)
+        with open(tmp, 'wb') as s:
+            np.savez(s, **sm.toArrays())
+        os.replace(tmp, path)
+    except Exception as err:
+        format("Warning: \tFailed to write cache entry {%}, %\n", (path, err))
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+    cacheEvict()
+    return True
+
+
+def cacheEvict(limit=-1):
+    # deletes the least recently used entries until the cache fits in limit bytes
+    if limit < 0: limit = cacheLimit
+    entries = []
+    total = 0
+    if not os.path.isdir(cachePath()): return 0
+    for e in os.scandir(cachePath()):
+        if e.name.endswith(".npz"):
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            append(entries, (st.st_mtime, st.st_size, e.path))
+            total += st.st_size
+    entries.sort()
+    for mtime, size, path in entries:
+        if total <= limit: break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
+
+
+def cacheClear():
+    return cacheEvict(0)
+
+
+# ====================================================================================
+# Session cache
+# ====================================================================================
+# parsed models and skeletons are kept in memory for the rest of the session, keyed
+# by (path, mtime, size) so a file that changes on disk is parsed again
+
+class lruCache:
+    '''
+        size bounded least recently used cache, put() is given the size of each
+        value and the oldest values are dropped once used goes past limit
+    '''
+    limit = 0
+    used = 0
+    hits = 0
+    misses = 0
+    items = None
+
+    def __init__(self, limit=0):
+        self.limit = limit
+        self.items = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key=None):
+        v = self.items.get(key)
+        if v == None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return v[0]
+
+    def put(self, key=None, value=None, nbytes=0):
+        if key in self.items: self.used -= self.items.pop(key)[1]
+        if nbytes > self.limit: return None  # wouldn't fit even on its own
+        self.items[key] = (value, nbytes)
+        self.used += nbytes
+        while self.used > self.limit and len(self.items) > 0:
+            self.used -= self.items.popitem(last=False)[1][1]
+        return None
+
+    def invalidate(self, path=None):
+        # drops every entry whose key mentions path, or everything if path is None
+        if path == None:
+            self.items.clear()
+            self.used = 0
+            return None
+        for key in [k for k in self.items if path in k]:
+            self.used -= self.items.pop(key)[1]
+        return None
+
+
+# read() keeps parsed models in modelCache
+useSessionCache = True
+
+modelCache = lruCache(256 * 1024 * 1024)
+
+skelCache = lruCache(16 * 1024 * 1024)
+
+
+def fileKey(file=""):
+    # (path, mtime, size) of a file, or None if it doesn't exist
+    if file == None or file == "": return None
+    try:
+        st = os.stat(file)
+    except OSError:
         return None
+    return (os.path.abspath(file), st.st_mtime, st.st_size)
 
 
-def read (file="", impSkin=True, mscale=0.00254, skelName = ""):
+def openSkel(file="", strict=False):
+    '''
+        returns the parsed fmtSKEL for file, from skelCache if it's unchanged
+        (and was read cleanly, for a strict read), None if it can't be read as a SKEL
+    '''
+    key = fileKey(file)
+    if key == None: return None
+    skel = skelCache.get(key)
+    if skel == None or (strict and not skel.clean):
+        skel = fmtSKEL()
+        if not skel.open(file, strict) or skel.type != "SKEL": return None
+        skelCache.put(key, skel, skel.nbytes())
+    return skel
+
+
+def sessionCacheInvalidate(file=None):
+    '''
+        forgets the parsed copies of file, or of everything if file is None
+        models linked to a skel file are dropped along with it
+    '''
+    path = os.path.abspath(file) if file != None and file != "" else None
+    modelCache.invalidate(path)
+    skelCache.invalidate(path)
+    return None
+
+
+def sessionCacheUsage():
+    # prints and returns the bytes held by the session caches
+    for name, c in (("models", modelCache), ("skels", skelCache)):
+        format("%: \t% entries, % / % bytes, % hits, % misses\n", (name, len(c), c.used, c.limit, c.hits, c.misses))
+    return modelCache.used + skelCache.used
+
+
+class fmtSM2_Probe:
+    '''
+        header summary of a .sm / .skin, filled in by probe() without decoding
+        any vertices, faces or bones
+    '''
+
+    '''string'''
+    file = ""
+
+    '''uint32_t'''
+    fsize = 0
+
+    '''uint32_t'''
+    type = 0
+
+    '''uint32_t'''
+    version = 0
+
+    '''uint32_t'''
+    num_verts = 0
+
+    '''float[3]'''
+    bb_min = [0.0, 0.0, 0.0]
+
+    '''float[3]'''
+    bb_max = [0.0, 0.0, 0.0]
+
+    '''float'''
+    draw_dist = 0.0
+
+    '''uint32_t'''
+    verts_addr = 0
+
+    '''uint32_t'''
+    meshs_addr = 0
+
+    '''uint32_t'''
+    bones_addr = 0  # 0 for SKI2 unless the objects were walked
+
+    # the following are only filled in when probing with names=True
+
+    '''string'''
+    name = ""
+
+    '''uint32_t[n]'''
+    face_counts = []  # triangles in each face buffer
+
+    '''uint32_t'''
+    num_faces = 0
+
+    '''uint32_t'''
+    num_bones = 0
+
+    '''uint16_t[n] / string[n]'''
+    bones = []  # bone ids for SKI2, 4 character names for SM2
+
+    def read(self, f=fopen(), names=False):
+        sm = fmtSM2()
+        if not sm.readHeader(f): return False
+        self.file = f.file
+        self.fsize = f.size
+        self.type = sm.type
+        self.version = sm.version
+        self.num_verts = sm.num_verts
+        self.bb_min = sm.bb_min
+        self.bb_max = sm.bb_max
+        self.draw_dist = sm.draw_dist
+        self.verts_addr = sm.verts_addr
+        self.meshs_addr = sm.meshs_addr
+        self.bones_addr = sm.bones_addr
+        self.name = ""
+        self.face_counts = []
+        self.num_faces = 0
+        self.num_bones = 0
+        self.bones = []
+        if names:
+            self.readObject(f)
+            self.readBones(f)
+        return True
+
+    def readObject(self, f=fopen()):
+        # walks the face buffers by their counts alone, the indices are not
+        # checked against max_index like fmtSM2_FaceBuf.read does
+        if self.meshs_addr <= 0 or self.meshs_addr >= f.size: return None
+        fseek(f, self.meshs_addr, seek_set)
+        name_len = readLong(f, unsigned)
+        if not f.check_size(name_len + 31, "object name"): return None
+        self.name = bytes(f.view[f.pos:f.pos + name_len]).replace(b'\x00', b'').decode('latin-1')
+        fseek(f, name_len + 31, seek_cur)  # unk003, max_index, unk004, bb_max, bb_min
+        while ftell(f) + 4 <= f.size:
+            count = readLong(f, unsigned)
+            if count == 0: break
+            if count * 6 > f.size - ftell(f):
+                fseek(f, -4, seek_cur)
+                break
+            append(self.face_counts, count)
+            self.num_faces += count
+            fseek(f, count * 6, seek_cur)
+        readLong(f, unsigned)  # unk005
+        fseek(f, f.find_nonzero(ftell(f), ftell(f) + 16), seek_set)
+        if self.type == 0x534B4932: self.bones_addr = ftell(f)
+        return None
+
+    def readBones(self, f=fopen()):
+        if self.bones_addr <= 0 or self.bones_addr >= f.size: return None
+        fseek(f, self.bones_addr, seek_set)
+        self.num_bones = readLong(f, unsigned)
+        stride = 34 if self.type == 0x534B4932 else 36
+        if not f.check_size(self.num_bones * stride, "bone records"):
+            self.num_bones = 0
+            return None
+        p = ftell(f)
+        self.bones = [0] * self.num_bones
+        for i in range(0, self.num_bones):
+            fseek(f, p + i * stride, seek_set)
+            if self.type == 0x534B4932:
+                self.bones[i] = readShort(f, unsigned)
+            else:
+                self.bones[i] = bytes(f.view[f.pos:f.pos + 4]).split(b'\x00', 1)[0].decode('latin-1')
+        return None
+
+
+def probe(file="", names=False):
+    '''
+        reads the header of a .sm / .skin (and with names the object name,
+        face buffer counts and bone ids) and returns a fmtSM2_Probe, or None
+    '''
+    result = None
+    if file != None and file != "" and doesFileExist(file):
+        f = fopen(file, "rb", useMmap=True)
+        if f.size > 0:
+            p = fmtSM2_Probe()
+            try:
+                if p.read(f, names): result = p
+            except ReadError as err:
+                format("Error: \tFailed to probe file, %\n", (str(err)))
+        f.close()  # read only, skip the flush in fclose
+    return result
+
+
+def findSibling(file="", ext=".skel", files=None):
+    '''
+        returns the file next to `file` with the same name and extension ext,
+        otherwise the first file in that folder with the extension, or ""
+        files can be a list of the folder's file names to avoid touching the disk
+    '''
+    p = Path(file)
+    want = p.stem + ext
+    if files == None:
+        if (p.parent / want).is_file(): return str(p.parent / want)
+        files = [Path(n).name for n in getFiles(os.path.join(str(p.parent), "*" + ext))]
+    else:
+        files = [n for n in files if n.lower().endswith(ext)]
+        if want in files: return str(p.parent / want)
+    files = sorted(files)
+    if len(files) > 0: return str(p.parent / files[0])
+    return ""
+
+
+def findSkelFile(file=""):
+    return findSibling(file, ".skel")
+
+
+def findTexFile(file=""):
+    return findSibling(file, ".dds")
+
+
+catalogExts = (".sm", ".skin", ".skel", ".dds")
+
+catalogColumns = (
+    ("path", "TEXT PRIMARY KEY"), ("size", "INTEGER"), ("mtime", "REAL"), ("kind", "TEXT"),
+    ("version", "INTEGER"), ("num_verts", "INTEGER"), ("num_faces", "INTEGER"), ("num_bones", "INTEGER"),
+    ("bb_min_x", "REAL"), ("bb_min_y", "REAL"), ("bb_min_z", "REAL"),
+    ("bb_max_x", "REAL"), ("bb_max_y", "REAL"), ("bb_max_z", "REAL"), ("draw_dist", "REAL"),
+    ("name", "TEXT"), ("bones", "TEXT"), ("skel", "TEXT"), ("tex", "TEXT"),
+    ("width", "INTEGER"), ("height", "INTEGER"), ("mips", "INTEGER"), ("fourcc", "TEXT"), ("error", "TEXT")
+)
+
+
+def catalogOpen(dbfile=""):
+    # opens (and creates) the catalog database
+    db = sqlite3.connect(dbfile)
+    db.execute("CREATE TABLE IF NOT EXISTS files (%s)" % ", ".join([c[0] + " " + c[1] for c in catalogColumns]))
+    db.execute("CREATE INDEX IF NOT EXISTS files_skel ON files (skel)")
+    db.execute("CREATE INDEX IF NOT EXISTS files_verts ON files (num_verts)")
+    return db
+
+
+def catalogProbe(file=""):
+    '''
+        probes a single file for the catalog, returns a dict of column values
+        this runs in the worker processes so it only reads and never builds
+    '''
+    row = {"path": file, "kind": "", "error": ""}
+    ext = getFilenameType(file).lower()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            if ext == ".sm" or ext == ".skin":
+                p = probe(file, True)
+                if p != None:
+                    row["kind"] = "SKI2" if p.type == 0x534B4932 else "SM2"
+                    row["version"] = p.version
+                    row["num_verts"] = p.num_verts
+                    row["num_faces"] = p.num_faces
+                    row["num_bones"] = p.num_bones
+                    row["bb_min_x"], row["bb_min_y"], row["bb_min_z"] = p.bb_min[0:3]
+                    row["bb_max_x"], row["bb_max_y"], row["bb_max_z"] = p.bb_max[0:3]
+                    row["draw_dist"] = p.draw_dist
+                    row["name"] = p.name
+                    row["bones"] = " ".join([str(b) for b in p.bones])
+            elif ext == ".skel":
+                f = fopen(file, "rb", useMmap=True)
+                skel = fmtSKEL()
+                skel.read(f)
+                f.close()
+                if skel.type == "SKEL":
+                    row["kind"] = "SKEL"
+                    row["version"] = skel.unk011
+                    row["num_bones"] = len(skel.parents)
+                    row["name"] = "|".join(skel.names)
+                    row["bones"] = " ".join([str(b.index) for b in skel.parents])
+            elif ext == ".dds":
+                f = fopen(file, "rb", useMmap=True)
+                if f.size >= 128 and bytes(f.view[0:4]) == b'DDS ':
+                    row["kind"] = "DDS"
+                    fseek(f, 12, seek_set)
+                    row["height"], row["width"] = readLongs(f, 2, unsigned)
+                    fseek(f, 28, seek_set)
+                    row["mips"] = readLong(f, unsigned)
+                    row["fourcc"] = bytes(f.view[84:88]).split(b'\x00', 1)[0].decode('latin-1')
+                f.close()
+    except Exception as err:
+        row["error"] = "%s: %s" % (type(err).__name__, str(err))
+    if row["kind"] == "" and row["error"] == "":
+        row["error"] = log.getvalue().strip()[0:200] or "Unrecognised file"
+    return row
+
+
+def catalogScan(root="", dbfile="", workers=0, chunksize=32):
+    '''
+        walks root and stores a probe of every .sm / .skin / .skel / .dds in the
+        SQLite catalog dbfile, only files whose size or mtime changed since the
+        last scan are probed again and files that are gone are dropped
+        workers: number of processes, 0 for one per cpu, 1 to probe serially
+        returns (probed, unchanged, removed)
+    '''
+    if sqlite3 == None:
+        format("Error: \tsqlite3 is not available\n")
+        return (0, 0, 0)
+    db = catalogOpen(dbfile)
+    known = {}
+    for path, size, mtime in db.execute("SELECT path, size, mtime FROM files"):
+        known[path] = (size, mtime)
+
+    # walk once, the folder listings are kept for the skel / texture linkage
+    stats = {}
+    folders = {}
+    for folder, dirs, names in os.walk(root):
+        folders[folder] = names
+        for n in names:
+            if n.lower().endswith(catalogExts):
+                path = os.path.join(folder, n)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stats[path] = (st.st_size, st.st_mtime)
+
+    todo = [p for p in stats if known.get(p) != stats[p]]
+    gone = [p for p in known if not p in stats]
+
+    rows = []
+    if len(todo) > 0:
+        if workers != 1 and len(todo) > chunksize and workersAvailable(catalogProbe):
+            try:
+                with concurrent.futures.ProcessPoolExecutor(workers if workers > 0 else None) as pool:
+                    rows = list(pool.map(catalogProbe, todo, chunksize=chunksize))
+            except Exception as err:
+                # no worker processes in this host (or this module can't be re-imported there)
+                format("Warning: \tParallel scan failed, probing serially {%}\n", (err))
+                rows = []
+        if len(rows) != len(todo):
+            rows = [catalogProbe(p) for p in todo]
+
+    names = [c[0] for c in catalogColumns]
+    sql = "INSERT OR REPLACE INTO files (%s) VALUES (%s)" % (", ".join(names), ", ".join(["?"] * len(names)))
+    with db:
+        for p in gone: db.execute("DELETE FROM files WHERE path = ?", (p,))
+        for row in rows:
+            p = row["path"]
+            row["size"], row["mtime"] = stats[p]
+            if row["kind"] == "SM2" or row["kind"] == "SKI2":
+                listing = folders.get(os.path.dirname(p), [])
+                if row["kind"] == "SKI2": row["skel"] = findSibling(p, ".skel", listing)
+                row["tex"] = findSibling(p, ".dds", listing)
+            db.execute(sql, [row.get(n) for n in names])
+    db.close()
+    return (len(rows), len(stats) - len(todo), len(gone))
+
+
+def modelKey(file="", skel_file=""):
+    # session cache key of a model, it changes if either file does
+    return (legacyHalfFloats,) + (fileKey(file) or ()) + (fileKey(skel_file) or ())
+
+
+def loadModel(file="", skel_file="", useMmap=None, strict=False, timeLimit=0.0, memLimit=0, useCache=None, useSession=True):
+    '''
+        returns (fmtSM2, parsed ok) from the session cache, the disk cache or the
+        file in that order, the model is None if the file was skipped with an error
+        useCache: reuse models parsed earlier from the session and disk caches,
+        None follows useSessionCache and useDiskCache
+        useSession: False leaves the session model cache out, for worker processes
+        whose cache nothing would read
+    '''
+    memKey = None
+    if useSession and useCache != False and useSessionCache: memKey = modelKey(file, skel_file)
+    sm = modelCache.get(memKey) if memKey != None else None
+    if sm != None and (sm.clean or not strict): return (sm, True)
+    sm = None
+
+    key = ""
+    if (useCache or (useCache == None and useDiskCache)) and np != None:
+        key = cacheKey([file, skel_file])
+        sm = cacheLoad(key)
+        # a lenient parse of a damaged file mustn't stand in for a strict one
+        if sm != None and strict and not sm.clean: sm = None
+
+    result = True
+    if sm == None:
+        f = fopen(file, "rb", useMmap=useMmap, strict=strict)
+        if f == None:
+            format("failed to open file {%}\n", (file))
+            return (None, False)
+        f.setBudget(timeLimit, memLimit)
+        sm = fmtSM2()
+        try:
+            result = sm.read(f, skelfile=skel_file)
+        except ReadError as err:
+            format("Error: \tSkipped file, %\n", (str(err)))
+            fclose(f)
+            return (None, False)
+        fclose(f)
+        if result and key != "": cacheStore(key, sm)
+    if result and memKey != None: modelCache.put(memKey, sm, sm.nbytes())
+    return (sm, result)
+
+
+def read (file="", impSkin=True, mscale=0.00254, skelName = "", useMmap=None, strict=False, timeLimit=0.0, memLimit=0, useCache=None, dispColour="loop", impNormals=True):
+    # strict, timeLimit (seconds) and memLimit (bytes) abort malformed files with a ReadError
+    # useCache: see loadModel
     if file != None and file != "":
         
                 
@@ -3004,44 +4990,313 @@ def read (file="", impSkin=True, mscale=0.00254, skelName = ""):
 
 
         if matchPattern(fext, pattern=".sm") or matchPattern(fext, pattern=".skin"):
-            f = fopen(file, "rb")
-            if f != None:
-                fpath = getFilenamePath(file)
-                fname = getFilenameFile(file)
-                skel_file = fpath + fname + ".skel"
-                mapd_file = fpath + fname + ".dds"
-                if not doesFileExist(skel_file):
-                    file = ""
-                    files = getFiles(fpath + "*.skel")
-                    for file in files:
-                        skel_file = file
-                        break
+            skel_file = findSkelFile(file)
+            mapd_file = findTexFile(file)
+            sm, result = loadModel(file, skel_file, useMmap, strict, timeLimit, memLimit, useCache)
+            if sm == None: return None
+            sm.build(mapd_file, impSkin=impSkin, mscale=mscale, skelName=skelName, dispColour=dispColour, impNormals=impNormals)
+            del sm
+        else:
+            format("file extension not supported {%}\n", (fext))
+    return None
+
+
+# payloads at least this big come back from the workers in shared memory
+shareThreshold = 1024 * 1024
+
+
+class sharedArrays:
+    '''
+        numpy arrays packed into one shared memory segment so only this small
+        descriptor is pickled, the receiver maps the arrays in place
+        the process that packs it lets go without unlinking, the receiver
+        calls release() once it's done with the views
+    '''
+
+    '''string'''
+    name = ""
+
+    '''uint32_t'''
+    size = 0
+
+    '''(key, dtype, shape, offset)[n]'''
+    layout = []
+
+    shm = None
+
+    def __init__(self, arrays={}):
+        self.layout = []
+        self.shm = None
+        items = []
+        size = 0
+        for k, v in arrays.items():
+            v = np.ascontiguousarray(v)
+            append(items, v)
+            append(self.layout, (k, v.dtype.str, v.shape, size))
+            size += (v.nbytes + 63) & ~63
+        self.size = size
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=size if size > 0 else 64, track=False)
+            tracked = False
+        except TypeError:
+            shm = shared_memory.SharedMemory(create=True, size=size if size > 0 else 64)
+            tracked = True
+        try:
+            for i in range(0, len(items)):
+                if items[i].nbytes > 0:
+                    k, dt, shape, offset = self.layout[i]
+                    np.ndarray(shape, dtype=dt, buffer=shm.buf, offset=offset)[...] = items[i]
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        self.name = shm.name
+        shm.close()
+        # keep this process's resource tracker from unlinking it when the worker exits
+        if tracked: resource_tracker.unregister(shm._name, "shared_memory")
+
+    def attach(self):
+        # returns {key: array} viewing the segment, valid until release()
+        self.shm = shared_memory.SharedMemory(name=self.name)
+        arrays = {}
+        for k, dt, shape, offset in self.layout:
+            arrays[k] = np.ndarray(shape, dtype=dt, buffer=self.shm.buf, offset=offset)
+        return arrays
+
+    def release(self):
+        # frees the segment, views still held keep their pages until they go
+        if self.shm == None:
+            try:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+            except FileNotFoundError:
+                return None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+        return None
+
+
+def shareArrays(arrays={}):
+    # a sharedArrays for large payloads where shared memory outlives its creator, else arrays
+    if shared_memory == None or os.name == 'nt': return arrays  # windows frees it with the last handle
+    nbytes = 0
+    for v in arrays.values(): nbytes += v.nbytes
+    if nbytes < shareThreshold: return arrays
+    try:
+        return sharedArrays(arrays)
+    except Exception as err:
+        format("Warning: \tFailed to share arrays, %\n", (err))
+        return arrays
+
+
+# worker processes readMany parses with, 0 for one per cpu, 1 to read serially
+parseWorkers = 0
 
-                if not doesFileExist(mapd_file):
-                    file = ""
-                    files = getFiles(fpath + "*.dds")
-                    for file in files:
-                        mapd_file = file
-                        break
 
+def workersAvailable(func=None):
+    '''
+        True if worker processes can find func, forked workers inherit it but spawned
+        ones (windows, macos) import its module again, which needs a file behind it
+        a script run from blender's text editor is a __main__ with no file
+    '''
+    try:
+        if multiprocessing.get_start_method() == "fork": return True
+    except Exception:
+        return False
+    name = func.__module__
+    if name == "__main__":
+        path = getattr(sys.modules.get(name), "__file__", None)
+        return path != None and os.path.isfile(path)
+    try:
+        return importlib.util.find_spec(name) != None
+    except (ImportError, ValueError):
+        # registered by registerModule, which has no spec of its own
+        return importlib.machinery.PathFinder.find_spec(name) != None
+
+
+def registerModule(name="bpy_god_summoner"):
+    '''
+        makes the script importable by name so readMany's workers can find parseFile
+        blender runs a text block as a temporary __main__, pickle can't look the
+        functions up in it once the script has finished, and spawned workers can't
+        import it at all
+        a text saved to disk is registered under its file name with its folder on
+        sys.path, so spawned workers import that file (as last saved), otherwise
+        only forked workers can use it. returns the name, unchanged if the script
+        was imported
+    '''
+    if __name__ != "__main__": return __name__
+    path = globals().get("__file__", "")
+    if bpy != None and not os.path.isfile(path):
+        # __file__ of a text block is the .blend path joined with the text's name
+        text = bpy.data.texts.get(os.path.basename(path))
+        if text != None and text.filepath != "": path = bpy.path.abspath(text.filepath)
+    if os.path.isfile(path):
+        name = Path(path).stem
+        folder = os.path.dirname(os.path.abspath(path))
+        if not folder in sys.path: append(sys.path, folder)
+    mod = sys.modules.get("__main__")
+    if getattr(mod, "__dict__", None) is not globals():
+        mod = types.ModuleType(name)
+        mod.__dict__.update(globals())
+    sys.modules[name] = mod
+    for v in list(globals().values()):
+        if (isinstance(v, types.FunctionType) or isinstance(v, type)) and v.__module__ == "__main__":
+            try:
+                v.__module__ = name
+            except (AttributeError, TypeError):
+                pass
+    return name
+
+
+def parseFile(file="", skel_file="", useCache=None, strict=False, share=False, timeLimit=0.0, memLimit=0):
+    '''
+        parses a model in a readMany worker process, nothing from bpy is touched
+        returns (fmtSM2.toArrays() or None, parsed ok), with share large results
+        come back as a sharedArrays instead
+    '''
+    with contextlib.redirect_stdout(io.StringIO()):
+        sm, result = loadModel(file, skel_file, strict=strict, timeLimit=timeLimit, memLimit=memLimit, useCache=useCache, useSession=False)
+    if sm == None: return (None, False)
+    arrays = sm.toArrays()
+    if share: arrays = shareArrays(arrays)
+    return (arrays, result)
+
+
+def buildArrays(job=("", "", ""), arrays={}, result=True, impSkin=True, mscale=0.00254, skelName="", useCache=None, dispColour="loop", impNormals=True):
+    # builds a model returned by parseFile, yielding like fmtSM2.buildSteps
+    # shared memory is read in place and released after
+    shared = None
+    if isinstance(arrays, sharedArrays):
+        shared = arrays
+        arrays = shared.attach()
+    try:
+        sm = fmtSM2()
+        sm.fromArrays(arrays)
+        for progress in sm.buildSteps(job[2], impSkin=impSkin, mscale=mscale, skelName=skelName, dispColour=dispColour, impNormals=impNormals): yield progress
+        nbytes = sm.nbytes()
+        if result and useCache != False and useSessionCache and nbytes <= modelCache.limit:
+            if shared != None:
+                # the cached copy can't keep pointing into the segment, only made if it'll fit
                 sm = fmtSM2()
-                sm.read(f, skelfile=skel_file)
-                sm.build(mapd_file, impSkin=impSkin, mscale=mscale, skelName=skelName)
-                del sm
-                fclose(f)
-            else:
-                format("failed to open file {%}\n", (file))
-        else:
-            format("file extension not supported {%}\n", (fext))
+                sm.fromArrays({k: np.array(v) for k, v in arrays.items()})
+            modelCache.put(modelKey(job[0], job[1]), sm, nbytes)
+    finally:
+        if shared != None:
+            sm = None
+            arrays = None
+            shared.release()
+
+
+def readMany(files=[], impSkin=True, mscale=0.00254, skelName="", useCache=None, workers=-1, dispColour="loop", impNormals=True, strict=False, timeLimit=0.0, memLimit=0):
+    '''
+        imports several files, parsing them in worker processes while the models
+        are built on this thread in the order they finish parsing
+        falls back to read() one at a time if worker processes aren't available
+        (the workers import this module, which needs to be importable by name)
+    '''
+    for progress in readManySteps(files, impSkin, mscale, skelName, useCache, workers, dispColour, impNormals, strict, timeLimit, memLimit): pass
     return None
 
 
-def write(sm = fmtSM2(), file=""):
+def readManySteps(files=[], impSkin=True, mscale=0.00254, skelName="", useCache=None, workers=-1, dispColour="loop", impNormals=True, strict=False, timeLimit=0.0, memLimit=0, poll=0.05):
+    '''
+        readMany() a piece at a time, yields how many files are done so far, with
+        the model being built counted by the fraction of it built
+        while no worker has a result ready it yields None after waiting up to poll
+        seconds, 0 doesn't wait at all so a caller on the UI thread never blocks
+        closing the generator early stops the workers and deletes the model that
+        was half built, models already finished stay in the scene
+        strict, timeLimit (seconds per file) and memLimit (bytes per file) are as for read()
+    '''
+    jobs = []
+    count = 0
+    for file in files:
+        fext = getFilenameType(file)
+        if matchPattern(fext, pattern=".sm") or matchPattern(fext, pattern=".skin"):
+            append(jobs, (file, findSkelFile(file), findTexFile(file)))
+        else:
+            format("file extension not supported {%}\n", (fext))
+            count += 1
+
+    # anything parsed earlier this session is built straight away
+    pending = []
+    for job in jobs:
+        sm = None
+        if useCache != False and useSessionCache: sm = modelCache.get(modelKey(job[0], job[1]))
+        if sm != None and (sm.clean or not strict):
+            for progress in sm.buildSteps(job[2], impSkin=impSkin, mscale=mscale, skelName=skelName, dispColour=dispColour, impNormals=impNormals): yield count + progress
+            count += 1
+        else:
+            append(pending, job)
+    yield count
+
+    if workers < 0: workers = parseWorkers
+    done = set()
+    if np != None and workers != 1 and len(pending) > 1 and not workersAvailable(parseFile):
+        format("Warning: \tWorker processes can't import this script, save it as a .py file to parse in parallel\n")
+        workers = 1
+    if np != None and workers != 1 and len(pending) > 1:
+        pool = None
+        futures = {}
+        try:
+            pickle.dumps(parseFile)  # the workers find parseFile by module name
+            pool = concurrent.futures.ProcessPoolExecutor(workers if workers > 0 else None)
+            for job in pending: futures[pool.submit(parseFile, job[0], job[1], useCache, strict, True, timeLimit, memLimit)] = job
+            format("Parsing % files in % worker processes\n", (len(pending), workers if workers > 0 else os.cpu_count()))
+            failed = False
+            while len(futures) > 0 and not failed:
+                ready = concurrent.futures.wait(futures, timeout=poll, return_when=concurrent.futures.FIRST_COMPLETED)[0]
+                if len(ready) == 0: yield None  # still parsing
+                for future in ready:
+                    job = futures.pop(future)
+                    try:
+                        arrays, result = future.result()
+                    except Exception as err:
+                        # a worker died or couldn't import this module, read the rest here
+                        format("Warning: \tParallel parsing failed, reading serially {%}\n", (err))
+                        failed = True
+                        break
+                    done.add(job)
+                    if arrays == None:
+                        format("Error: \tSkipped file {%}\n", (job[0]))
+                    else:
+                        for progress in buildArrays(job, arrays, result, impSkin, mscale, skelName, useCache, dispColour, impNormals): yield count + progress
+                    count += 1
+                    yield count
+        except (pickle.PicklingError, OSError, NotImplementedError, concurrent.futures.BrokenExecutor) as err:
+            format("Warning: \tParallel parsing failed, reading serially {%}\n", (err))
+        finally:
+            if pool != None: pool.shutdown(wait=True, cancel_futures=True)
+            # results never built still hold shared memory
+            for future in futures:
+                if future.done() and not future.cancelled() and future.exception() == None:
+                    if isinstance(future.result()[0], sharedArrays): future.result()[0].release()
+
+    for job in pending:
+        if job in done: continue
+        sm, result = loadModel(job[0], job[1], strict=strict, timeLimit=timeLimit, memLimit=memLimit, useCache=useCache)
+        if sm != None:
+            for progress in sm.buildSteps(job[2], impSkin=impSkin, mscale=mscale, skelName=skelName, dispColour=dispColour, impNormals=impNormals): yield count + progress
+        count += 1
+        yield count
+
+
+def write(sm = fmtSM2(), file="", compress="", level=1):
+    # compress: "raw" or "lzop" to write lzo1x compressed, see lzo_pack
     if file != None and file != "" and sm != None:
         fext = getFilenameType(file)
         if matchPattern(fext, pattern=".sm"):
             s = fopen(file, "wb")
             if s != None:
+                s.compress = compress
+                s.level = level
                 sm.write(s)
 
                 fclose(s)
@@ -3057,10 +5312,14 @@ def write(sm = fmtSM2(), file=""):
 
 # Callback when file(s) are selected
 
-def smimp_callback(fpath="", files=[], clearScene=True, armName="Armature", impWeights=False, mscale=0.00254):
+# seconds between the import operator's timer events and how long each one works for,
+# the slice is kept shorter than the tick so the UI gets the time in between
+importTick = 0.05
+importSlice = 0.03
+
+def smimp_callback(fpath="", files=[], clearScene=True, armName="Armature", impWeights=False, mscale=0.00254, useCache=True, dispColour="loop", impNormals=True, strict=False, timeLimit=0.0, memLimit=0):
     if len(files) > 0 and clearScene: deleteScene(['MESH', 'ARMATURE'])
-    for file in files:
-        read (fpath + file.name, impSkin=impWeights, mscale=mscale, skelName = armName)
+    readMany([fpath + file.name for file in files], impSkin=impWeights, mscale=mscale, skelName=armName, useCache=useCache, dispColour=dispColour, impNormals=impNormals, strict=strict, timeLimit=timeLimit, memLimit=memLimit)
     if len(files) > 0:
         messageBox("Done!")
         return True
@@ -3109,10 +5368,19 @@ def smimp(reload=False):
         my_bool1: bpy.props.BoolProperty(name="Clear Scene", default=True, description="Deletes everything in the scene prior to importing")
         #my_bool2: bpy.props.BoolProperty(name="Skeleton", default=False, description="Imports Bones to an Armature")
         my_bool3: bpy.props.BoolProperty(name="Vertex Weights", default=False, description="Builds Vertex Groups")
-        #my_bool4: bpy.props.BoolProperty(name="Vertex Normals", default=False, description="Applies Custom Normals")
+        my_bool4: bpy.props.BoolProperty(name="Vertex Normals", default=True, description="Applies Custom Normals")
         #my_bool5: bpy.props.BoolProperty(name="Vertex Colours", default=False, description="Builds Vertex Colours")
         #my_bool6: bpy.props.BoolProperty(name="Guess Parents", default=False, description="Uses algorithm to Guess Bone Parenting")
         #my_bool7: bpy.props.BoolProperty(name="Dump Textures", default=False, description="Writes Textures from a file pair '_tex.bin'")
+        my_bool8: bpy.props.BoolProperty(name="Use Cache", default=True, description="Reuses models decoded by an earlier import instead of parsing them again")
+        my_enum1: bpy.props.EnumProperty(name="Display Colour", default='loop', description="Random colour given to each mesh to tell them apart", items=[
+            ('loop', "Vertex Colour", "Fills a vertex colour attribute with the random colour"),
+            ('object', "Object Colour", "Sets the object colour, shown with the viewport's Object colour mode"),
+            ('none', "None", "No display colour")
+            ])
+        my_bool9: bpy.props.BoolProperty(name="Strict Parsing", default=False, description="Skips malformed files instead of importing what can be read from them")
+        my_float2: bpy.props.FloatProperty(name="Time Limit", default=0.0, min=0.0, description="Seconds a file may take to parse before it's skipped, 0 for no limit")
+        my_int1: bpy.props.IntProperty(name="Memory Limit (MB)", default=0, min=0, description="Memory a file may decode to before it's skipped, 0 for no limit")
         my_string1: bpy.props.StringProperty(name="", default="Armature", description="Name of Armature to Import Bones to")
 
 
@@ -3135,6 +5403,24 @@ def smimp(reload=False):
             try: self.my_bool3 = bpy.types.Scene.smimp_my_bool3
             except: bpy.types.Scene.smimp_my_bool3 = bpy.props.BoolProperty(default=False)
 
+            try: self.my_bool4 = bpy.types.Scene.smimp_my_bool4
+            except: bpy.types.Scene.smimp_my_bool4 = bpy.props.BoolProperty(default=True)
+
+            try: self.my_bool8 = bpy.types.Scene.smimp_my_bool8
+            except: bpy.types.Scene.smimp_my_bool8 = bpy.props.BoolProperty(default=True)
+
+            try: self.my_enum1 = bpy.types.Scene.smimp_my_enum1
+            except: bpy.types.Scene.smimp_my_enum1 = bpy.props.StringProperty(default="loop")
+
+            try: self.my_bool9 = bpy.types.Scene.smimp_my_bool9
+            except: bpy.types.Scene.smimp_my_bool9 = bpy.props.BoolProperty(default=False)
+
+            try: self.my_float2 = bpy.types.Scene.smimp_my_float2
+            except: bpy.types.Scene.smimp_my_float2 = bpy.props.FloatProperty(default=0.0)
+
+            try: self.my_int1 = bpy.types.Scene.smimp_my_int1
+            except: bpy.types.Scene.smimp_my_int1 = bpy.props.IntProperty(default=0)
+
             try: self.my_string1 = bpy.types.Scene.my_string1
             except: bpy.types.Scene.my_string1 = bpy.props.BoolProperty(default=False)
 
@@ -3147,8 +5433,63 @@ def smimp(reload=False):
 
         # Runs when this Window is CANCELLED
         def cancel(self, context):
+            if getattr(self, "_steps", None) != None:
+                self.finish(context, True)
+                return None
             print("run bitch")
 
+        # Runs on each timer event while importing, Esc cancels
+        def modal(self, context, event):
+            if event.type == 'ESC':
+                self.finish(context, True)
+                return {'CANCELLED'}
+            if event.type != 'TIMER':
+                # leave the viewport navigable but keep edits out of the scene being built
+                if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'MOUSEMOVE', 'TRACKPADPAN', 'TRACKPADZOOM'}:
+                    return {'PASS_THROUGH'}
+                return {'RUNNING_MODAL'}
+
+            # anything raised here would cancel the operator and leave the timer running
+            try:
+                stop = time.time() + importSlice
+                while time.time() < stop:
+                    progress = next(self._steps)
+                    if progress == None: break  # the workers are still parsing, wait for the next tick
+                    self._progress = progress
+
+                total = len(self._files)
+                elapsed = time.time() - self._start
+                rate = self._progress / elapsed if elapsed > 0 else 0.0
+                eta = (total - self._progress) / rate if rate > 0 else 0.0
+                context.window_manager.progress_update(self._progress)
+                context.workspace.status_text_set("Importing %i / %i files, %.1f files/s, %is left (Esc to cancel)" % (
+                    int(self._progress), total, rate, int(eta)))
+            except StopIteration:
+                self.finish(context, False)
+                messageBox("Done!")
+                return {'FINISHED'}
+            except Exception as err:
+                self.finish(context, True)
+                self.report({'ERROR'}, "Import failed, " + str(err))
+                return {'CANCELLED'}
+            return {'RUNNING_MODAL'}
+
+        # stops the timer and progress, cancelling closes the import so the half built model is removed
+        def finish(self, context, cancelled=False):
+            if self._steps == None: return None
+            wm = context.window_manager
+            steps = self._steps
+            self._steps = None
+            try:
+                if cancelled:
+                    steps.close()
+                    self.report({'WARNING'}, "Import cancelled, %i of %i files imported" % (int(self._progress), len(self._files)))
+            finally:
+                wm.event_timer_remove(self._timer)
+                wm.progress_end()
+                context.workspace.status_text_set(None)
+            return None
+
         # Runs when the class EXITS
         def execute(self, context):
 
@@ -3158,19 +5499,44 @@ def smimp(reload=False):
             bpy.types.Scene.smimp_my_float1 = self.my_float1
             bpy.types.Scene.smimp_my_bool1 = self.my_bool1
             bpy.types.Scene.smimp_my_bool3 = self.my_bool3
+            bpy.types.Scene.smimp_my_bool4 = self.my_bool4
+            bpy.types.Scene.smimp_my_bool8 = self.my_bool8
+            bpy.types.Scene.smimp_my_enum1 = self.my_enum1
+            bpy.types.Scene.smimp_my_bool9 = self.my_bool9
+            bpy.types.Scene.smimp_my_float2 = self.my_float2
+            bpy.types.Scene.smimp_my_int1 = self.my_int1
             bpy.types.Scene.smimp_my_string1 = self.my_string1
 
-            # Run Callback
-            smimp_callback(
-                self.directory,
-                self.files,
-                self.my_bool1,
-                self.my_string1,
-                self.my_bool3,
-                self.my_float1
-                )
-
-            return {"FINISHED"}
+            # Run Callback, without a window to report progress in it runs in one go
+            if bpy.app.background or context.window == None:
+                smimp_callback(
+                    self.directory,
+                    self.files,
+                    self.my_bool1,
+                    self.my_string1,
+                    self.my_bool3,
+                    self.my_float1,
+                    self.my_bool8,
+                    self.my_enum1,
+                    self.my_bool4,
+                    self.my_bool9,
+                    self.my_float2,
+                    self.my_int1 * 1024 * 1024
+                    )
+                return {"FINISHED"}
+
+            # Otherwise import a slice at a time from timer events so the UI stays live
+            if len(self.files) > 0 and self.my_bool1: deleteScene(['MESH', 'ARMATURE'])
+            self._files = [self.directory + file.name for file in self.files]
+            self._steps = readManySteps(self._files, impSkin=self.my_bool3, mscale=self.my_float1, skelName=self.my_string1, useCache=self.my_bool8, dispColour=self.my_enum1, impNormals=self.my_bool4,
+                strict=self.my_bool9, timeLimit=self.my_float2, memLimit=self.my_int1 * 1024 * 1024, poll=0)
+            self._progress = 0.0
+            self._start = time.time()
+            wm = context.window_manager
+            wm.progress_begin(0, max(1, len(self._files)))
+            self._timer = wm.event_timer_add(importTick, window=context.window)
+            wm.modal_handler_add(self)
+            return {'RUNNING_MODAL'}
 
             # Window Settings
 
@@ -3193,10 +5559,18 @@ def smimp(reload=False):
             box = self.layout.box()
             box.label(text="Include")
             box.prop(self, "my_bool3")
+            box.prop(self, "my_bool4")
             box = self.layout.box()
             box.label(text="Misc")
             box.label(text="Import Bones To:")
             box.prop(self, "my_string1")
+            box.prop(self, "my_bool8")
+            box.prop(self, "my_enum1")
+            box = self.layout.box()
+            box.label(text="Malformed Files")
+            box.prop(self, "my_bool9")
+            box.prop(self, "my_float2")
+            box.prop(self, "my_int1")
 
             self.layout.separator()
 
@@ -3226,20 +5600,116 @@ def smimp(reload=False):
     bpy.ops.importhelper.smimp('INVOKE_DEFAULT')
 
 
+# Command line tools, outside blender ################################################
+
+def printProbe(p=fmtSM2_Probe()):
+    format("%\n", (p.file))
+    format("\ttype: \t% v%, % bytes\n", ("SKI2" if p.type == 0x534B4932 else "SM2", p.version, p.fsize))
+    format("\tverts: \t%\n", (p.num_verts))
+    format("\tbounds: \t% %\n", (p.bb_min, p.bb_max))
+    if p.name != "" or len(p.face_counts) > 0:
+        format("\tobject: \t%, % faces in buffers %\n", (p.name, p.num_faces, p.face_counts))
+        format("\tbones: \t% %\n", (p.num_bones, p.bones))
+    return None
+
+
+def benchmark(files=[], repeat=3):
+    '''
+        times parsing each file with the caches off, best of repeat
+        returns (files/s, MB/s) over all of them
+    '''
+    total = 0.0
+    size = 0
+    for file in files:
+        best = 0.0
+        for i in range(0, repeat):
+            t = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                sm, result = loadModel(file, findSkelFile(file), useCache=False)
+            t = time.perf_counter() - t
+            if best == 0.0 or t < best: best = t
+        if sm == None:
+            format("Error: \tSkipped file {%}\n", (file))
+            continue
+        format("%: \t% verts, % ms\n", (os.path.basename(file), sm.num_verts, round(best * 1000.0, 2)))
+        total += best
+        size += os.path.getsize(file)
+    if total <= 0: return (0.0, 0.0)
+    fps = len(files) / total
+    mbs = size / (1024.0 * 1024.0) / total
+    format("parse: \t% files/s, % MB/s\n", (round(fps, 1), round(mbs, 1)))
+    return (fps, mbs)
+
+
+def main(argv=None):
+    '''
+        python bpy_god_summoner.py probe [--names] file ...
+        python bpy_god_summoner.py catalog [--workers n] root db
+        python bpy_god_summoner.py bench [--repeat n] [--level n] [file ...]
+        python bpy_god_summoner.py test
+    '''
+    parser = argparse.ArgumentParser(prog="bpy_god_summoner", description="God Summoner model tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cmd = sub.add_parser("probe", help="print the header of .sm / .skin files")
+    cmd.add_argument("files", nargs="+")
+    cmd.add_argument("--names", action="store_true", help="also walk the objects and bones")
+    cmd = sub.add_parser("catalog", help="scan a folder into an SQLite catalog")
+    cmd.add_argument("root")
+    cmd.add_argument("db")
+    cmd.add_argument("--workers", type=int, default=0, help="processes, 0 for one per cpu")
+    cmd = sub.add_parser("bench", help="time parsing files, or lzo1x without any")
+    cmd.add_argument("files", nargs="*")
+    cmd.add_argument("--repeat", type=int, default=3)
+    cmd.add_argument("--level", type=int, default=1, help="lzo1x compression level")
+    sub.add_parser("test", help="round trip lzo1x compression, exits 1 on a failure")
+    args = parser.parse_args(argv)
+
+    if args.command == "probe":
+        failed = 0
+        for file in args.files:
+            p = probe(file, args.names)
+            if p == None:
+                format("Error: \tNot a model {%}\n", (file))
+                failed += 1
+            else: printProbe(p)
+        return 1 if failed > 0 else 0
+    if args.command == "catalog":
+        probed, unchanged, removed = catalogScan(args.root, args.db, args.workers)
+        format("catalog: \t% probed, % unchanged, % removed\n", (probed, unchanged, removed))
+        return 0
+    if args.command == "test":
+        try:
+            format("lzo1x: \t% round trips ok\n", (lzo1x_selftest()))
+        except ReadError as err:
+            format("Error: \t%\n", (str(err)))
+            return 1
+        return 0
+    if len(args.files) > 0:
+        benchmark(args.files, args.repeat)
+    else:
+        lzo1x_benchmark(repeat=args.repeat, level=args.level)
+    return 0
+
+
 # END OF MAIN FUNCTION ##############################################################
 
-clearListener()  # clears out console
-if not useOpenDialog:
+if bpy != None and __name__ == "__main__":
+    registerModule()  # lets readMany's worker processes find this script
+    clearListener()  # clears out console
+    if not useOpenDialog:
 
-    deleteScene(['MESH', 'ARMATURE'])
+        deleteScene(['MESH', 'ARMATURE'])
     
-    read (
-        #"E:\\BackUp\\MyCloud4100\\Coding\\Maxscripts\\File IO\\Shinobi Master Senran Kagura New Link\\cos_model\\ne453_model\\ne453_mdl.bum"
-        #"E:\\BackUp\\MyCloud4100\\Coding\\Maxscripts\\File IO\\Shinobi Master Senran Kagura New Link\\cos_model\\ne453_model\\ne453_mdl.bum"
-        "E:\\BackUp\\MyCloud4100\\Coding\\Maxscripts\\File IO\\Shinobi Master Senran Kagura New Link\\hair_model\\hr140_model\\hr140_mdl.bum"
-        )
-    messageBox("Done!")
-else: smimp(True)
+        read (
+            #"E:\\BackUp\\MyCloud4100\\Coding\\Maxscripts\\File IO\\Shinobi Master Senran Kagura New Link\\cos_model\\ne453_model\\ne453_mdl.bum"
+            #"E:\\BackUp\\MyCloud4100\\Coding\\Maxscripts\\File IO\\Shinobi Master Senran Kagura New Link\\cos_model\\ne453_model\\ne453_mdl.bum"
+            "E:\\BackUp\\MyCloud4100\\Coding\\Maxscripts\\File IO\\Shinobi Master Senran Kagura New Link\\hair_model\\hr140_model\\hr140_mdl.bum"
+            )
+        messageBox("Done!")
+    else: smimp(True)
+
+if bpy == None and __name__ == "__main__":
+    sys.exit(main())
 
 # bpy.context.scene.unit_settings.system = 'METRIC'
 
@@ -0,0 +1,15 @@
+import os
+import zipfile
+
+import pytest
+
+samplesZip = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "samples.zip")
+
+
+@pytest.fixture(scope="session")
+def samples(tmp_path_factory):
+    # the sample models from assets/samples.zip, extracted once per run
+    folder = tmp_path_factory.mktemp("samples")
+    with zipfile.ZipFile(samplesZip) as z:
+        z.extractall(folder)
+    return folder
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bpy_god_summoner as gs  # noqa: E402  imports without blender
+
+np = pytest.importorskip("numpy")
+
+models = [("npc/mb35_obj1.skin", "npc/common.skel"), ("npc/mb35_obj2.skin", "npc/common.skel"), ("wep/bs06.sm", "")]
+
+
+def parse(samples, name, skel):
+    f = gs.fopen(str(samples / name), "rb")
+    sm = gs.fmtSM2()
+    assert sm.read(f, skelfile=str(samples / skel) if skel != "" else "")
+    f.close()
+    return sm
+
+
+def assertSame(a, b):
+    assert sorted(a) == sorted(b)
+    for k in a:
+        assert a[k].dtype == b[k].dtype, k
+        assert np.array_equal(a[k], b[k]), k
+
+
+@pytest.mark.parametrize("name, skel", models)
+def test_arrays_round_trip(samples, name, skel):
+    sm = parse(samples, name, skel)
+    a = sm.toArrays()
+    copy = gs.fmtSM2()
+    assert copy.fromArrays(a)
+    assertSame(copy.toArrays(), a)
+    assert copy.num_verts == sm.num_verts and copy.clean
+    assert [len(fb.faces) for fb in copy.meshs.faceBuf] == [len(fb.faces) for fb in sm.meshs.faceBuf]
+    assert copy.bones.skel.names == sm.bones.skel.names
+
+
+@pytest.mark.parametrize("name, skel", models)
+def test_disk_cache_round_trip(samples, tmp_path, monkeypatch, name, skel):
+    monkeypatch.setattr(gs, "cacheDir", str(tmp_path))
+    sm = parse(samples, name, skel)
+    key = gs.cacheKey([str(samples / name), str(samples / skel) if skel != "" else ""])
+    gs.cacheStore(key, sm)
+    assertSame(gs.cacheLoad(key).toArrays(), sm.toArrays())
+
+
+def test_entry_without_clean_flag(samples):
+    a = parse(samples, "wep/bs06.sm", "").toArrays()
+    del a['clean']
+    copy = gs.fmtSM2()
+    copy.fromArrays(a)
+    assert not copy.clean
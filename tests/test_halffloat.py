@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bpy_god_summoner as gs  # noqa: E402  imports without blender
+
+np = pytest.importorskip("numpy")
+
+# every half with a normal exponent, where the legacy bit shuffle is exact
+normals = [h for h in range(0, 0x10000) if 0 < (h >> 10) & 0x1F < 0x1F]
+
+
+def test_zero():
+    assert gs.halfToFloat(0) == 0.0
+    assert gs.halfToFloat(0x8000) == 0.0
+    assert np.signbit(gs.halfToFloat(0x8000))
+
+
+@pytest.mark.parametrize("h, value", [(0x0001, 2.0 ** -24), (0x03FF, 1023 * 2.0 ** -24), (0x3C00, 1.0),
+                                      (0xC000, -2.0), (0x7BFF, 65504.0), (0x7C00, float("inf"))])
+def test_values(h, value):
+    assert gs.halfToFloat(h) == value
+    assert gs.halfToFloatArray([h])[0] == value
+
+
+def test_legacy_matches_on_normal_halves():
+    for h in normals:
+        assert gs.halfToFloat(h, True) == gs.halfToFloat(h, False)
+    assert (gs.halfToFloatArray(normals, True) == gs.halfToFloatArray(normals, False)).all()
+
+
+def test_array_matches_scalar():
+    raw = np.arange(0, 0x10000, dtype=np.uint16)
+    for legacy in (False, True):
+        out = gs.halfToFloatArray(raw, legacy)
+        assert out.dtype == np.float32
+        scalar = np.array([gs.halfToFloat(int(h), legacy) for h in raw], dtype=np.float32)
+        assert np.array_equal(out, scalar, equal_nan=True)
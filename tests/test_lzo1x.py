@@ -0,0 +1,49 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bpy_god_summoner as gs  # noqa: E402  imports without blender
+
+rng = random.Random(0x534D32)
+inputs = {
+    "empty": b'',
+    "tiny": b'a',
+    "tiny_magic": b'2MS\x00',
+    "incompressible": bytes(rng.getrandbits(8) for i in range(70000)),
+    "zeros": b'\x00' * 300000,
+    "repeated": b'abc' * 100000,
+    "mixed": gs.lzo1x_synthesize(200000, 1)[1],
+    }
+
+
+def unpack(packed, container):
+    if container == "lzop": return gs.lzop_unpack(packed)
+    size = gs.getStructTable(True)[('long', gs.unsigned)].unpack_from(packed, 0)[0]
+    return gs.lzo1x_decompress(packed[4:], size)
+
+
+@pytest.mark.parametrize("container", ["raw", "lzop"])
+@pytest.mark.parametrize("level", [1, 9])
+@pytest.mark.parametrize("name", list(inputs))
+def test_round_trip(name, level, container):
+    data = inputs[name]
+    out = unpack(gs.lzo_pack(data, container, level), container)
+    assert out is not None
+    assert bytes(out) == data
+
+
+def test_raw_stream_is_sniffed():
+    # lzo_unpack only takes a raw stream that decodes to a known magic
+    data = b'2MS\x00' + bytes(64)
+    assert bytes(gs.lzo_unpack(gs.lzo_pack(data, "raw", 1))) == data
+    assert bytes(gs.lzo_unpack(gs.lzo_pack(data, "lzop", 1))) == data
+
+
+def test_corrupt_stream_raises():
+    packed = gs.lzo1x_compress(inputs["mixed"], 1)
+    with pytest.raises(gs.ReadError):
+        gs.lzo1x_decompress(packed[:len(packed) // 2], len(inputs["mixed"]))
@@ -0,0 +1,119 @@
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bpy_god_summoner as gs  # noqa: E402  imports without blender
+
+huge = 0x7FFFFFFF
+
+
+def read(file, strict=False, skel="", seconds=0.0, memory=0):
+    f = gs.fopen(str(file), "rb", strict=strict)
+    f.setBudget(seconds, memory)
+    sm = gs.fmtSM2()
+    try:
+        result = sm.read(f, skelfile=skel)
+    finally:
+        f.close()
+    return sm, result
+
+
+def damaged(samples, tmp_path, name, offset, value=huge):
+    # a copy of a sample with the uint32 at offset replaced
+    data = bytearray((samples / name).read_bytes())
+    struct.pack_into('<I', data, offset, value)
+    file = tmp_path / os.path.basename(name)
+    file.write_bytes(data)
+    return file
+
+
+def truncated(samples, tmp_path, name, size):
+    file = tmp_path / os.path.basename(name)
+    file.write_bytes((samples / name).read_bytes()[0:size])
+    return file
+
+
+def countOffset(samples, name, field):
+    # (offset of the count, offset the strict read fails at)
+    sm, result = read(samples / name)
+    assert result and sm.clean
+    if field == "vertex": return (8, sm.verts_addr)
+    if field == "face": return (sm.meshs.faceAddrs[0], sm.meshs.faceAddrs[0] + 4)
+    return (sm.bones_addr, sm.bones_addr + 4)
+
+
+cases = [("wep/bs06.sm", "vertex"), ("wep/bs06.sm", "face"), ("wep/bs06.sm", "bone"),
+         ("npc/mb35_obj1.skin", "face"), ("npc/mb35_obj1.skin", "bone")]
+
+
+@pytest.mark.parametrize("name, field", cases)
+def test_huge_count_strict(samples, tmp_path, name, field):
+    offset, failAt = countOffset(samples, name, field)
+    file = damaged(samples, tmp_path, name, offset)
+    with pytest.raises(gs.ReadError) as err:
+        read(file, strict=True)
+    assert err.value.offset == failAt
+    assert err.value.file == str(file)
+
+
+@pytest.mark.parametrize("name, field", cases)
+def test_huge_count_lenient(samples, tmp_path, name, field):
+    offset, failAt = countOffset(samples, name, field)
+    file = damaged(samples, tmp_path, name, offset)
+    sm, result = read(file)
+    assert not sm.clean
+    if field == "bone": assert len(sm.bones.bones) < huge
+
+
+def test_huge_skel_bone_count(samples, tmp_path):
+    file = damaged(samples, tmp_path, "npc/common.skel", 20)
+    with pytest.raises(gs.ReadError):
+        gs.fmtSKEL().open(str(file), True)
+    skel = gs.fmtSKEL()
+    assert skel.open(str(file), False)
+    assert not skel.clean and len(skel.names) < huge
+
+
+@pytest.mark.parametrize("name, size", [("npc/mb35_obj1.skin", 30000), ("wep/bs06.sm", 13760), ("wep/bs06.sm", 100)])
+def test_truncated(samples, tmp_path, name, size):
+    file = truncated(samples, tmp_path, name, size)
+    with pytest.raises(gs.ReadError) as err:
+        read(file, strict=True)
+    assert 0 <= err.value.offset <= size
+    sm, result = read(file)
+    assert not sm.clean
+
+
+def test_truncated_vertex_buffer_clamps(samples, tmp_path):
+    file = truncated(samples, tmp_path, "npc/mb35_obj1.skin", 30000)
+    sm, result = read(file)
+    assert 0 < len(sm.verts.position) < sm.num_verts
+
+
+def test_memory_budget(samples):
+    for strict in (False, True):
+        with pytest.raises(gs.ReadError, match="Memory budget"):
+            read(samples / "wep/bs06.sm", strict, memory=1024)
+    sm, result = read(samples / "wep/bs06.sm", memory=64 * 1024 * 1024)
+    assert result and sm.clean
+
+
+def test_time_budget(samples):
+    with pytest.raises(gs.ReadError, match="time budget"):
+        read(samples / "npc/mb35_obj1.skin", seconds=1e-9)
+    sm, result = read(samples / "npc/mb35_obj1.skin", seconds=60.0)
+    assert result and sm.clean
+
+
+def test_strict_load_skips_lenient_cache(samples, tmp_path, monkeypatch):
+    monkeypatch.setattr(gs, "cacheDir", str(tmp_path / "cache"))
+    file = truncated(samples, tmp_path, "npc/mb35_obj1.skin", 30000)
+    sm, result = gs.loadModel(str(file), "")
+    assert sm != None and not sm.clean
+    assert gs.loadModel(str(file), "", strict=True) == (None, False)
+    gs.sessionCacheInvalidate()
+    assert gs.loadModel(str(file), "", strict=True) == (None, False)
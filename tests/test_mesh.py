@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bpy_god_summoner as gs  # noqa: E402  imports without blender
+
+np = pytest.importorskip("numpy")
+
+
+def sanitize(numVerts, faces):
+    keep, counts = gs.mesh_sanitize(numVerts, np.array(faces, dtype=np.int64).reshape(-1, 3))
+    return (keep.tolist(), counts)
+
+
+def test_clean_faces_are_kept():
+    assert sanitize(4, [[0, 1, 2], [2, 1, 3]]) == ([True, True], {"range": 0, "degenerate": 0, "duplicate": 0})
+
+
+def test_empty():
+    assert sanitize(4, []) == ([], {"range": 0, "degenerate": 0, "duplicate": 0})
+
+
+def test_out_of_range():
+    keep, counts = sanitize(3, [[0, 1, 2], [0, 1, 3], [-1, 1, 2]])
+    assert keep == [True, False, False]
+    assert counts["range"] == 2
+
+
+def test_degenerate():
+    keep, counts = sanitize(3, [[0, 0, 1], [0, 1, 2], [2, 2, 2]])
+    assert keep == [False, True, False]
+    assert counts == {"range": 0, "degenerate": 2, "duplicate": 0}
+
+
+def test_duplicates_keep_the_first():
+    # the same vertices in any order, winding included, count as one face
+    keep, counts = sanitize(4, [[1, 2, 3], [0, 1, 2], [2, 1, 0], [1, 2, 0], [3, 2, 1]])
+    assert keep == [True, True, False, False, False]
+    assert counts == {"range": 0, "degenerate": 0, "duplicate": 3}
+
+
+def test_an_index_is_only_counted_once():
+    # out of range wins over degenerate, bad faces aren't duplicates of anything
+    keep, counts = sanitize(2, [[0, 5, 5], [0, 5, 5], [0, 1, 1]])
+    assert keep == [False, False, False]
+    assert counts == {"range": 2, "degenerate": 1, "duplicate": 0}
+
+
+@pytest.mark.parametrize("numVerts", [100, 1 << 21, 1 << 40])
+def test_packed_and_row_paths_agree(numVerts):
+    # up to 21 bits an index the faces are packed into one int64, past that rows are compared
+    rng = np.random.default_rng(0x534D32)
+    faces = rng.integers(0, min(numVerts, 60), size=(2000, 3)) * max(1, numVerts // 64)
+    keep, counts = gs.mesh_sanitize(numVerts, faces)
+    seen = set()
+    for i, face in enumerate(faces.tolist()):
+        good = len(set(face)) == 3 and tuple(sorted(face)) not in seen
+        if good: seen.add(tuple(sorted(face)))
+        assert keep[i] == good
+    assert counts["duplicate"] + counts["degenerate"] + int(keep.sum()) == len(faces)
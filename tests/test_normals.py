@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bpy_god_summoner as gs  # noqa: E402  imports without blender
+
+np = pytest.importorskip("numpy")
+
+packed = [[255, 127, 128, 255], [0, 128, 127, 0], [128, 255, 128, 128], [10, 200, 30, 64]]
+
+
+def test_axes():
+    n = gs.decodeNormals([[255, 127.5, 127.5, 0], [127.5, 0, 127.5, 0]])
+    assert np.allclose(n, [[1, 0, 0], [0, -1, 0]])
+
+
+def test_unit_length():
+    n = gs.decodeNormals(np.random.default_rng(0x534D32).integers(0, 256, size=(1000, 4), dtype=np.uint8))
+    assert n.dtype == np.float32 and n.shape == (1000, 3)
+    assert np.allclose((n * n).sum(axis=1), 1.0, atol=1e-5)
+
+
+def test_not_normalized():
+    assert np.allclose(gs.decodeNormals([[255, 0, 127.5, 0]], False), [[1, -1, 0]])
+
+
+def test_order_and_sign(monkeypatch):
+    monkeypatch.setattr(gs, "normalOrder", (2, 0, 1))
+    monkeypatch.setattr(gs, "normalSign", (1.0, -1.0, 1.0))
+    n = gs.decodeNormals([[255, 127.5, 0, 0]], False)
+    assert np.allclose(n, [[-1, -1, 0]])
+
+
+def test_w():
+    assert np.allclose(gs.decodeNormalW([[0, 0, 0, 255], [0, 0, 0, 0]]), [1, -1])
+
+
+@pytest.mark.parametrize("normalize", [True, False])
+def test_without_numpy_matches(monkeypatch, normalize):
+    expect = gs.decodeNormals(packed, normalize)
+    w = gs.decodeNormalW(packed)
+    monkeypatch.setattr(gs, "np", None)
+    assert np.allclose(gs.decodeNormals(packed, normalize), expect, atol=1e-6)
+    assert np.allclose(gs.decodeNormalW(packed), w)
+
+
+def test_sample_normals(samples):
+    f = gs.fopen(str(samples / "wep/bs06.sm"), "rb")
+    sm = gs.fmtSM2()
+    sm.read(f)
+    f.close()
+    n = gs.decodeNormals(sm.verts.normal)
+    assert len(n) == sm.num_verts
+    assert np.allclose((n * n).sum(axis=1), 1.0, atol=1e-5)